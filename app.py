@@ -1,14 +1,10 @@
-import os
-import os
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import streamlit as st
 import pandas as pd
 
-from src.ingestion import FitbitLoader
-from src.algorithms import calculate_readiness
-from src.visuals import (plot_polar_activity, poincare_plot, sleep_ribbon_plot, heart_rate_trend, 
-                         steps_trend, resting_heart_rate_trend, sleep_duration_trend, 
-                         activity_heatmap, heart_rate_distribution, ibi_trend)
+from src.ingestion import FitbitLoader, derive_ibi
 from src.components import render_metric_cards
 
 
@@ -18,12 +14,40 @@ DEFAULT_PATH = r"G:\Mijn Drive\Takeout"
 st.set_page_config(page_title="Fitbit Analytics", layout="wide")
 
 
+@st.cache_resource(show_spinner=False)
+def get_loader(path: str) -> FitbitLoader:
+    """One FitbitLoader per data path, shared across reruns instead of rebuilt each time."""
+    return FitbitLoader(path)
+
+
 @st.cache_data(ttl=3600)
 def load_master_dataframe(path: str):
-    loader = FitbitLoader(path)
-    return loader.process_all()
+    loader = get_loader(path)
+    # read straight from the parquet caches when they are newer than every source
+    dfs = loader.load_cached()
+    if dfs is None:
+        dfs = loader.process_all()
+    return dfs
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def cache_status(path: str) -> dict:
+    """Parquet cache status, coalesced across reruns that land within a few seconds."""
+    return get_loader(path).get_cache_status()
+
+
+def _df_fingerprint(df: pd.DataFrame) -> tuple:
+    """Cheap cache key for a frame: shape, columns and first/last index labels."""
+    if df.empty:
+        return (df.shape, tuple(df.columns))
+    return (df.shape, tuple(df.columns), df.index[0], df.index[-1])
+
 
+# hashing whole frames on every rerun costs more than the work being cached
+_DF_HASH_FUNCS = {pd.DataFrame: _df_fingerprint}
 
+
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS, show_spinner=False)
 def get_data_availability(dfs: dict) -> dict:
     """Analyze loaded dataframes and return availability info."""
     info = {
@@ -44,23 +68,79 @@ def get_data_availability(dfs: dict) -> dict:
                     idx = df.index
                 else:
                     # Try first datetime column
-                    for col in df.columns:
-                        if pd.api.types.is_datetime64_any_dtype(df[col]):
-                            idx = df[col]
-                            break
-                    else:
-                        idx = None
+                    dt_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns
+                    idx = df[dt_cols[0]] if len(dt_cols) else None
                 
                 if idx is not None:
-                    min_date = pd.to_datetime(idx.min()).date()
-                    max_date = pd.to_datetime(idx.max()).date()
-                    info[key]['date_range'] = (min_date, max_date)
+                    ts_min, ts_max = idx.min(), idx.max()
+                    # datetime indexes/columns already yield Timestamps; only convert the odd ones
+                    if not isinstance(ts_min, pd.Timestamp):
+                        ts_min, ts_max = pd.to_datetime(ts_min), pd.to_datetime(ts_max)
+                    info[key]['date_range'] = (ts_min.date(), ts_max.date())
             except Exception:
                 pass
     
     return info
 
 
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS, show_spinner=False)
+def overview_metrics(daily: pd.DataFrame) -> dict:
+    """Average steps, resting heart rate and sleep score for the metric cards."""
+    metrics = {
+        'avg_steps': 0,
+        'rhr': None,
+        'sleep_score': None,
+    }
+
+    if not daily.empty:
+        # one reduction over all three columns; skipna avoids materialising dropna() copies
+        cols = [c for c in ('steps', 'resting_heart_rate', 'sleep_score') if c in daily.columns]
+        means = daily[cols].mean(skipna=True, numeric_only=True)
+        for key, col in (('avg_steps', 'steps'), ('rhr', 'resting_heart_rate'), ('sleep_score', 'sleep_score')):
+            val = means.get(col)
+            metrics[key] = int(val) if pd.notna(val) else 0
+    return metrics
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink numeric columns to the narrowest dtype holding their values (bpm -> uint8, floats -> float32)."""
+    if df is None or df.empty:
+        return df
+    dtypes = {}
+    for col in df.select_dtypes(include='number').columns:
+        s = df[col]
+        if pd.api.types.is_integer_dtype(s):
+            narrowed = pd.to_numeric(s, downcast='unsigned')
+            if narrowed.dtype == s.dtype:
+                narrowed = pd.to_numeric(s, downcast='integer')
+        else:
+            narrowed = pd.to_numeric(s, downcast='float')
+        if narrowed.dtype != s.dtype:
+            dtypes[col] = narrowed.dtype
+    return df.astype(dtypes) if dtypes else df
+
+
+@functools.lru_cache(maxsize=None)
+def cached_figure(builder):
+    """Wrap a `src.visuals` builder in st.cache_data so unchanged frames reuse the built figure."""
+    return st.cache_data(hash_funcs=_DF_HASH_FUNCS, show_spinner=False)(builder)
+
+
+def overall_date_range(availability: dict):
+    """Return (first, last) date across all available data types, or None."""
+    ranges = [v['date_range'] for v in availability.values() if v['available'] and v['date_range']]
+    if not ranges:
+        return None
+    return (min(r[0] for r in ranges), max(r[1] for r in ranges))
+
+
+def store_dfs(dfs: dict):
+    """Put loaded frames in session state along with per-key non-empty flags and the overall date range."""
+    st.session_state['dfs'] = dfs
+    st.session_state['dfs_nonempty'] = {k: isinstance(v, pd.DataFrame) and not v.empty for k, v in dfs.items()}
+    st.session_state['overall_range'] = overall_date_range(get_data_availability(dfs)) if dfs else None
+
+
 def print_data_summary(dfs: dict, path: str, file_info: dict = None):
     """Print a formatted summary of loaded data and files to terminal."""
     availability = get_data_availability(dfs)
@@ -82,7 +162,6 @@ def print_data_summary(dfs: dict, path: str, file_info: dict = None):
     print(f"Data Types Loaded: {len(available_types)}")
     print("-"*70)
     
-    all_dates = []
     total_records = 0
     
     for key in available_types:
@@ -91,15 +170,14 @@ def print_data_summary(dfs: dict, path: str, file_info: dict = None):
         date_str = ""
         if info['date_range']:
             date_str = f" | {info['date_range'][0]} to {info['date_range'][1]}"
-            all_dates.extend(info['date_range'])
         print(f"  ✓ {key.upper():15} | {info['count']:>8,} records{date_str}")
     
     print("-"*70)
     print(f"  TOTAL:          | {total_records:>8,} records")
     
-    if all_dates:
-        overall_min = min(all_dates)
-        overall_max = max(all_dates)
+    overall = overall_date_range(availability)
+    if overall:
+        overall_min, overall_max = overall
         date_span = (overall_max - overall_min).days
         print(f"  DATE RANGE:     | {overall_min} to {overall_max} ({date_span} days)")
     
@@ -141,8 +219,7 @@ def main():
 
         if show_cache:
             try:
-                loader_tmp = FitbitLoader(data_path)
-                status = loader_tmp.get_cache_status()
+                status = cache_status(data_path)
                 st.sidebar.markdown("**Cache status**")
                 for k, v in status.items():
                     fresh_mark = '✅' if v['fresh'] else '❌'
@@ -156,7 +233,9 @@ def main():
             try:
                 pbar = st.sidebar.progress(0)
                 status_text = st.sidebar.empty()
-                loader = FitbitLoader(data_path)
+                loader = get_loader(data_path)
+                # the loader is shared across reruns; make it look for new exports
+                loader.refresh_sources()
                 steps = [
                     ('heart_rate', loader.load_heart_rate),
                     ('steps', loader.load_steps),
@@ -165,23 +244,18 @@ def main():
                 ]
                 total = len(steps)
                 dfs = {}
-                for i, (k, fn) in enumerate(steps, start=1):
-                    status_text.text(f'Loading {k} ({i}/{total})...')
-                    dfs[k] = fn()
-                    pbar.progress(int(i / total * 100))
-
-                # derive ibi
-                hr = dfs.get('heart_rate', pd.DataFrame())
-                if not hr.empty and 'bpm' in hr.columns:
-                    ibi = 60000.0 / hr['bpm'].replace({0: None})
-                    ibi = ibi.dropna()
-                    ibi_df = pd.DataFrame({'ibi': ibi.astype(float)})
-                    ibi_df.index = ibi.index
-                else:
-                    ibi_df = pd.DataFrame()
-
-                dfs['ibi'] = ibi_df
-                st.session_state['dfs'] = dfs
+                # the loaders read disjoint file sets, so run them side by side
+                status_text.text(f'Loading {total} data types...')
+                with ThreadPoolExecutor(max_workers=total) as ex:
+                    futures = {ex.submit(fn): k for k, fn in steps}
+                    for i, fut in enumerate(as_completed(futures), start=1):
+                        k = futures[fut]
+                        dfs[k] = downcast_numeric(fut.result())
+                        status_text.text(f'Loaded {k} ({i}/{total})')
+                        pbar.progress(int(i / total * 100))
+
+                dfs['ibi'] = derive_ibi(dfs.get('heart_rate', pd.DataFrame()))
+                store_dfs(dfs)
                 pbar.progress(100)
                 status_text.text('Load complete.')
                 st.success('Data loaded (with progress)')
@@ -194,7 +268,7 @@ def main():
     # Show data availability summary
     with st.sidebar.expander("Data Summary", expanded=True):
         d = st.session_state.get('dfs', {})
-        if d and any(not df.empty if isinstance(df, pd.DataFrame) else False for df in d.values()):
+        if any(st.session_state.get('dfs_nonempty', {}).values()):
             availability = get_data_availability(d)
             for key, info in availability.items():
                 if info['available']:
@@ -202,28 +276,25 @@ def main():
                     st.write(f"✅ **{key.replace('_', ' ').title()}**: {info['count']} records ({date_range_str})")
             
             # Overall date range
-            all_dates = []
-            for key, info in availability.items():
-                if info['available'] and info['date_range']:
-                    all_dates.extend(info['date_range'])
-            if all_dates:
-                overall_min = min(all_dates)
-                overall_max = max(all_dates)
+            overall = st.session_state.get('overall_range')
+            if overall:
+                overall_min, overall_max = overall
                 st.divider()
                 st.write(f"📅 **Overall Date Range**: {overall_min} to {overall_max}")
                 st.write("✅ **Status**: All available data is being displayed")
         else:
             st.write("No data loaded. Click 'Load / Refresh' to load data.")
-        st.session_state['dfs'] = {}
+        if 'dfs' not in st.session_state:
+            store_dfs({})
         if auto_load:
             try:
-                st.session_state['dfs'] = load_master_dataframe(data_path)
+                store_dfs(load_master_dataframe(data_path))
                 # Print terminal summary on auto-load with file info
-                loader = FitbitLoader(data_path)
+                loader = get_loader(data_path)
                 file_info = loader.get_file_listing()
                 print_data_summary(st.session_state['dfs'], data_path, file_info)
             except Exception:
-                st.session_state['dfs'] = {}
+                store_dfs({})
 
     d = st.session_state['dfs']
 
@@ -233,11 +304,13 @@ def main():
 
     # Overview
     with tabs[0]:
+        from src.visuals import plot_polar_activity, heart_rate_distribution, resting_heart_rate_trend, heart_rate_trend
+
         st.header("Overview")
         
         # Show data availability at top
-        availability = get_data_availability(d)
-        if any(info['available'] for info in availability.values()):
+        if any(st.session_state.get('dfs_nonempty', {}).values()):
+            availability = get_data_availability(d)
             col1, col2, col3 = st.columns(3)
             data_types_available = [k.replace('_', ' ').title() for k, v in availability.items() if v['available']]
             
@@ -247,37 +320,19 @@ def main():
                 total_records = sum(v['count'] for v in availability.values() if v['available'])
                 st.metric("Total Records", f"{total_records:,}")
             with col3:
-                all_dates = []
-                for key, info in availability.items():
-                    if info['available'] and info['date_range']:
-                        all_dates.extend(info['date_range'])
-                if all_dates:
-                    date_span = (max(all_dates) - min(all_dates)).days
+                overall = st.session_state.get('overall_range')
+                if overall:
+                    date_span = (overall[1] - overall[0]).days
                     st.metric("Date Span", f"{date_span} days")
             
             st.info(f"📊 Data loaded: {', '.join(data_types_available)} — All available data is displayed")
             st.divider()
-        metrics = {
-            'avg_steps': 0,
-            'rhr': None,
-            'sleep_score': None,
-        }
-
-        daily = d.get('daily', pd.DataFrame())
-        if not daily.empty:
-            avg_steps = daily.get('steps', pd.Series()).dropna().mean()
-            metrics['avg_steps'] = int(avg_steps) if pd.notna(avg_steps) else 0
-            rhr = daily.get('resting_heart_rate', pd.Series()).dropna().mean()
-            metrics['rhr'] = int(rhr) if pd.notna(rhr) else 0
-            sleep_score = daily.get('sleep_score', pd.Series()).dropna().mean()
-            metrics['sleep_score'] = int(sleep_score) if pd.notna(sleep_score) else 0
-
-        render_metric_cards(metrics)
+        render_metric_cards(overview_metrics(d.get('daily', pd.DataFrame())))
 
         hr = d.get('heart_rate', pd.DataFrame())
         if not hr.empty:
             st.subheader("Circadian Activity (Polar)")
-            fig = plot_polar_activity(hr)
+            fig = cached_figure(plot_polar_activity)(hr)
             st.plotly_chart(fig, width='stretch')
         else:
             st.info("No heart rate data available to render polar chart.")
@@ -287,52 +342,56 @@ def main():
         with col1:
             hr = d.get('heart_rate', pd.DataFrame())
             if not hr.empty:
-                st.plotly_chart(heart_rate_distribution(hr), width='stretch')
+                st.plotly_chart(cached_figure(heart_rate_distribution)(hr), width='stretch')
         with col2:
             daily = d.get('daily', pd.DataFrame())
             if not daily.empty:
-                st.plotly_chart(resting_heart_rate_trend(daily), width='stretch')
+                st.plotly_chart(cached_figure(resting_heart_rate_trend)(daily), width='stretch')
 
         st.divider()
         hr = d.get('heart_rate', pd.DataFrame())
         if not hr.empty:
-            st.plotly_chart(heart_rate_trend(hr), width='stretch')
+            st.plotly_chart(cached_figure(heart_rate_trend)(hr), width='stretch')
 
     # Sleep Lab
     with tabs[1]:
+        from src.visuals import sleep_ribbon_plot, sleep_duration_trend
+
         st.header("Sleep Lab")
         sleep = d.get('sleep', pd.DataFrame())
         if not sleep.empty:
-            fig = sleep_ribbon_plot(sleep)
+            fig = cached_figure(sleep_ribbon_plot)(sleep)
             st.plotly_chart(fig, width='stretch')
             st.divider()
-            st.plotly_chart(sleep_duration_trend(sleep), width='stretch')
+            st.plotly_chart(cached_figure(sleep_duration_trend)(sleep), width='stretch')
         else:
             st.info("No sleep logs found.")
 
     # Activity tab
     with tabs[2]:
+        from src.visuals import steps_trend, ibi_trend, activity_heatmap, poincare_plot
+
         st.header("Activity")
         
         col1, col2 = st.columns(2)
         with col1:
             steps = d.get('steps', pd.DataFrame())
             if not steps.empty:
-                st.plotly_chart(steps_trend(steps), width='stretch')
+                st.plotly_chart(cached_figure(steps_trend)(steps), width='stretch')
         with col2:
             ibi = d.get('ibi', pd.DataFrame())
             if not ibi.empty:
-                st.plotly_chart(ibi_trend(ibi), width='stretch')
+                st.plotly_chart(cached_figure(ibi_trend)(ibi), width='stretch')
         
         st.divider()
         steps = d.get('steps', pd.DataFrame())
         if not steps.empty:
-            st.plotly_chart(activity_heatmap(steps), width='stretch')
+            st.plotly_chart(cached_figure(activity_heatmap)(steps), width='stretch')
         
         st.divider()
         ibi = d.get('ibi', pd.DataFrame())
         if not ibi.empty:
-            fig = poincare_plot(ibi)
+            fig = cached_figure(poincare_plot)(ibi)
             st.plotly_chart(fig, width='stretch')
         else:
             st.info("No IBI/HRV data available for Poincaré plot.")
@@ -1,47 +1,14 @@
+import numpy as np
 import pandas as pd
+import streamlit as st
 
 
-def calculate_readiness(df_daily: pd.DataFrame, span: int = 14) -> pd.DataFrame:
-    """Compute a simple shadow readiness score.
-
-    Expects `df_daily` with columns: 'rmssd', 'total_sleep_minutes', 'activity_calories'.
-    Returns df_daily with added 'shadow_readiness_score'.
-    """
-    if df_daily is None or df_daily.empty:
-        return df_daily
-
-    df = df_daily.copy()
-    # Ensure numeric
-    for c in ['rmssd', 'total_sleep_minutes', 'activity_calories']:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce')
-        else:
-            df[c] = 0
-
-    # Baselines via EMA
-    df['rmssd_base'] = df['rmssd'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
-    df['sleep_base'] = df['total_sleep_minutes'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
-    df['activity_base'] = df['activity_calories'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
-
-    # Normalized component scores (0-100)
-    df['z_hrv'] = (df['rmssd'] / df['rmssd_base']) * 100
-    df['z_sleep'] = (df['total_sleep_minutes'] / df['sleep_base']) * 100
-    # Activity: lower activity may increase readiness — so invert ratio
-    df['z_activity'] = (df['activity_base'] / (df['activity_calories'] + 1)) * 100
-
-    # Clip
-    for c in ['z_hrv', 'z_sleep', 'z_activity']:
-        df[c] = df[c].clip(lower=0, upper=200)
-
-    # Weights
-    w_hrv, w_sleep, w_activity = 0.5, 0.3, 0.2
-    df['shadow_readiness_score'] = (w_hrv * df['z_hrv'] + w_sleep * df['z_sleep'] + w_activity * df['z_activity'])
-    df['shadow_readiness_score'] = df['shadow_readiness_score'].clip(0, 100)
-
-    return df
-import pandas as pd
+def _frame_key(df: pd.DataFrame) -> tuple:
+    # shape, last index label and column names are enough to tell daily frames apart
+    return (df.shape, df.index.max() if len(df) else None, df.columns.tolist())
 
 
+@st.cache_data(hash_funcs={pd.DataFrame: _frame_key}, show_spinner=False)
 def calculate_readiness(df_daily: pd.DataFrame, span: int = 14) -> pd.DataFrame:
     """Compute a simple shadow readiness score.
 
@@ -51,32 +18,44 @@ def calculate_readiness(df_daily: pd.DataFrame, span: int = 14) -> pd.DataFrame:
     if df_daily is None or df_daily.empty:
         return df_daily
 
-    df = df_daily.copy()
-    # Ensure numeric
+    # Ensure numeric; kept local so the input frame is never copied or mutated
+    inputs = {}
     for c in ['rmssd', 'total_sleep_minutes', 'activity_calories']:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce')
+        if c in df_daily.columns:
+            inputs[c] = pd.to_numeric(df_daily[c], errors='coerce')
         else:
-            df[c] = 0
+            inputs[c] = pd.Series(0, index=df_daily.index)
+    raw = pd.DataFrame(inputs)
 
-    # Baselines via EMA
-    df['rmssd_base'] = df['rmssd'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
-    df['sleep_base'] = df['total_sleep_minutes'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
-    df['activity_base'] = df['activity_calories'].ewm(span=span, adjust=False).mean().fillna(method='ffill')
+    # Baselines via EMA, one 2-D ewm pass over all three inputs
+    bases = raw.ewm(span=span, adjust=False).mean().ffill().to_numpy(dtype=np.float64)
+    rmssd_base, sleep_base, activity_base = bases.T
 
-    # Normalized component scores (0-100)
-    df['z_hrv'] = (df['rmssd'] / df['rmssd_base']) * 100
-    df['z_sleep'] = (df['total_sleep_minutes'] / df['sleep_base']) * 100
-    # Activity: lower activity may increase readiness — so invert ratio
-    df['z_activity'] = (df['activity_base'] / (df['activity_calories'] + 1)) * 100
+    # Work on raw float arrays from here on: each pandas op would allocate a Series
+    rmssd, sleep, activity = raw.to_numpy(dtype=np.float64).T
 
-    # Clip
-    for c in ['z_hrv', 'z_sleep', 'z_activity']:
-        df[c] = df[c].clip(lower=0, upper=200)
+    # Normalized component scores (0-100), clipped in place
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_hrv = rmssd / rmssd_base * 100
+        z_sleep = sleep / sleep_base * 100
+        # Activity: lower activity may increase readiness — so invert ratio
+        z_activity = activity_base / (activity + 1) * 100
+    for z in (z_hrv, z_sleep, z_activity):
+        np.clip(z, 0, 200, out=z)
 
     # Weights
     w_hrv, w_sleep, w_activity = 0.5, 0.3, 0.2
-    df['shadow_readiness_score'] = (w_hrv * df['z_hrv'] + w_sleep * df['z_sleep'] + w_activity * df['z_activity'])
-    df['shadow_readiness_score'] = df['shadow_readiness_score'].clip(0, 100)
-
-    return df
+    score = w_hrv * z_hrv + w_sleep * z_sleep + w_activity * z_activity
+    np.clip(score, 0, 100, out=score)
+
+    # a single assign() copies df_daily once and attaches every derived column
+    return df_daily.assign(
+        **inputs,
+        rmssd_base=rmssd_base,
+        sleep_base=sleep_base,
+        activity_base=activity_base,
+        z_hrv=z_hrv,
+        z_sleep=z_sleep,
+        z_activity=z_activity,
+        shadow_readiness_score=score,
+    )
@@ -1,28 +1,12 @@
 import streamlit as st
 
 
-def render_metric_cards(values: dict):
-    cols = st.columns(4)
-    labels = [
-        ('Avg Steps', values.get('avg_steps', 0)),
-        ('Avg RHR', values.get('rhr', '—')),
-        ('Sleep Score', values.get('sleep_score', '—')),
-        ('Active Mins', values.get('active_mins', '—')),
-    ]
-    for col, (title, val) in zip(cols, labels):
-        with col:
-            st.metric(label=title, value=val)
-import streamlit as st
+_METRIC_KEYS = ('avg_steps', 'rhr', 'sleep_score', 'active_mins')
+_METRIC_LABELS = ('Avg Steps', 'Avg RHR', 'Sleep Score', 'Active Mins')
+_METRIC_DEFAULTS = (0, '—', '—', '—')
 
 
 def render_metric_cards(values: dict):
-    cols = st.columns(4)
-    labels = [
-        ('Avg Steps', values.get('avg_steps', 0)),
-        ('Avg RHR', values.get('rhr', '—')),
-        ('Sleep Score', values.get('sleep_score', '—')),
-        ('Active Mins', values.get('active_mins', '—')),
-    ]
-    for col, (title, val) in zip(cols, labels):
-        with col:
-            st.metric(label=title, value=val)
+    vals = [values.get(k, d) for k, d in zip(_METRIC_KEYS, _METRIC_DEFAULTS)]
+    for col, title, val in zip(st.columns(4), _METRIC_LABELS, vals):
+        col.metric(label=title, value=val)
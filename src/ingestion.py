@@ -1,24 +1,759 @@
 import os
 import fnmatch
+import functools
 import json
 import re
+import shutil
 import io
 import zipfile
+import zlib
+import mmap
+import struct
 import time
 import hashlib
+import warnings
+import threading
+import queue
+import collections
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from typing import Dict, Iterator, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib parser is used otherwise
+    orjson = None
+
+# both accept raw bytes, so callers can skip the .decode('utf-8') step
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pandas' own CSV reader and parquet writer are used instead
+    pa = pacsv = pq = None
+
+try:
+    import ijson
+except ImportError:  # optional; large files are then parsed in one go
+    ijson = None
+
+# seconds a loader trusts its source index and the mtimes and signatures derived
+# from it, counted from the end of the walk
+_SOURCE_TTL = 2.0
+
+# cache kind -> source patterns it is built from
+_CACHE_KINDS = {
+    'heart_rate': ['heart_rate-*.json'],
+    'steps': ['steps-*.json'],
+    'sleep': ['sleep-*.json'],
+    'daily': ['*daily*.csv', '*Daily Activity*.csv'],
+}
+
+# process_all stages the rows of this many finished sources in .fitbit_cache/staging,
+# so an interrupted run keeps its progress without rewriting the caches each time
+_META_FLUSH_EVERY = 100
+
+# caches written by a process_all run this many seconds ago are trusted without a source check
+_PROCESSED_GRACE = 60.0
+
+# sleep sessions compress well; zstd level 3 decodes about as fast as snappy
+_SLEEP_PARQUET_OPTS = {'compression': 'zstd', 'compression_level': 3}
+
+# large row groups keep the heart rate cache's columnar decode fast
+_HR_PARQUET_OPTS = {'compression': 'zstd', 'row_group_size': 1_000_000}
+
+# heart rate payloads above this size are streamed entry by entry when ijson is installed
+_STREAM_THRESHOLD = 32 << 20
+
+
+# fnmatch.fnmatch/filter are case-insensitive on Windows (via normcase); keep that
+_GLOB_FLAGS = re.IGNORECASE if os.name == 'nt' else 0
+
+
+@functools.lru_cache(maxsize=None)
+def _glob_matcher(*patterns: str):
+    """Compile shell globs once into one regex; returns a `match(name)` callable for any of them."""
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns), _GLOB_FLAGS).match
+
+
+def _scan_files(root) -> Iterator[os.DirEntry]:
+    """Recursively yield file entries under `root`.
+
+    os.scandir hands back the entry type from the directory read itself, so this
+    avoids the per-file stat calls of os.walk + Path.stat. Symlinked directories
+    are not followed (same as os.walk's default).
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _read_csv(source):
+    """Read a CSV from a path or raw bytes.
+
+    Returns a pyarrow Table (threaded reader) when pyarrow is installed, so a batch
+    of CSVs can be concatenated before a single conversion; else a DataFrame.
+    """
+    if pacsv is not None:
+        try:
+            src = pa.BufferReader(source) if isinstance(source, bytes) else str(source)
+            opts = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+            return pacsv.read_csv(src, read_options=opts)
+        except Exception:
+            pass
+    return pd.read_csv(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _concat_csvs(parts) -> pd.DataFrame:
+    """Concatenate `_read_csv` results, converting Arrow tables to pandas once."""
+    tables = [p for p in parts if pa is not None and isinstance(p, pa.Table)]
+    if tables and len(tables) == len(parts):
+        try:
+            if int(pa.__version__.split('.')[0]) >= 14:
+                merged = pa.concat_tables(tables, promote_options='permissive')
+            else:
+                merged = pa.concat_tables(tables, promote=True)
+            return merged.to_pandas(date_as_object=False)
+        except Exception:
+            pass
+    frames = [p.to_pandas(date_as_object=False) if pa is not None and isinstance(p, pa.Table) else p for p in parts]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_atomic(path, data: bytes):
+    """Replace `path` with `data` via a sibling temp file, so a killed run never leaves it truncated."""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _read_file(path) -> bytes:
+    """Read a whole file, telling the kernel (where supported) that access is sequential."""
+    with open(path, 'rb') as fh:
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return fh.read()
+
+
+def _read_member(zf: zipfile.ZipFile, mm, member: zipfile.ZipInfo) -> bytes:
+    """Return a member's bytes straight out of the mapped zip where possible.
+
+    Stored members are sliced, deflated ones inflated in one zlib call into a buffer
+    of the known final size (ZipExtFile reads in small chunks and joins them).
+    Anything else, or a failed CRC check, goes through `zf.read`.
+    """
+    if mm is not None and member.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) and not member.flag_bits & 0x1:
+        off = member.header_offset
+        sig, name_len, extra_len = struct.unpack('<4s22xHH', mm[off:off + 30])
+        if sig == b'PK\x03\x04':
+            start = off + 30 + name_len + extra_len
+            end = start + member.compress_size
+            if member.compress_type == zipfile.ZIP_STORED:
+                data = mm[start:end]
+            else:
+                with memoryview(mm)[start:end] as raw:
+                    data = zlib.decompress(raw, -15, max(member.file_size, 1))
+            if zlib.crc32(data) == member.CRC:
+                return data
+    return zf.read(member)
+
+
+# threads inflating members of one zip at a time; zlib releases the GIL while it works
+_ZIP_THREADS = min(8, os.cpu_count() or 1)
+
+
+def _iter_members(zf: zipfile.ZipFile, mm, members, workers: int = _ZIP_THREADS):
+    """Yield (member, bytes) in order, inflating up to `workers` members concurrently.
+
+    Members that fail to read are skipped. Must be consumed inside the `_open_zip`
+    block that produced `zf` and `mm`.
+    """
+    if workers <= 1 or len(members) < 2:
+        for member in members:
+            try:
+                yield member, _read_member(zf, mm, member)
+            except Exception:
+                continue
+        return
+
+    def _result(fut):
+        try:
+            return fut.result()
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = collections.deque()
+        for member in members:
+            pending.append((member, ex.submit(_read_member, zf, mm, member)))
+            if len(pending) >= 2 * workers:
+                done, fut = pending.popleft()
+                content = _result(fut)
+                if content is not None:
+                    yield done, content
+        while pending:
+            done, fut = pending.popleft()
+            content = _result(fut)
+            if content is not None:
+                yield done, content
+
+
+@contextmanager
+def _open_zip(path):
+    """Open a zip together with a read-only memory map of the same file."""
+    with open(path, 'rb') as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None
+        try:
+            with zipfile.ZipFile(fh) as zf:
+                yield zf, mm
+        finally:
+            if mm is not None:
+                mm.close()
+
+
+_DATE_RE = re.compile(r"20\d{2}-\d{2}-\d{2}")
+
+
+def _basename(src: str) -> str:
+    """Final component of a file path or `archive.zip!member` label, without building a Path."""
+    return src[max(src.rfind('/'), src.rfind(os.sep), src.rfind('!')) + 1:]
+
+
+def _extract_date(name: str, prefix: str = None):
+    if prefix and name.startswith(prefix):
+        # kind-YYYY-MM-DD.json: slice at the known offset, regex only as fallback
+        cand = name[len(prefix):len(prefix) + 10]
+        if len(cand) == 10 and cand[4] == cand[7] == '-' and cand.startswith('20') and cand.replace('-', '').isdigit():
+            return cand
+    m = _DATE_RE.search(name)
+    return m.group(0) if m else None
+
+
+# --- per-file parsers ---
+# Module level so they can be shipped to worker processes. Each returns plain
+# column lists for one file; unreadable JSON yields empty lists, and anything else
+# they raise on malformed entries is caught by `_parse_source`.
+
+def _parse_heart_rate_file(src: str, content: bytes) -> Tuple[list, list, list]:
+    """Return (dateTimes, bpms, confidences) from one heart_rate-*.json payload."""
+    base_date = _extract_date(_basename(src), 'heart_rate-') or ''
+    if ijson is not None and len(content) > _STREAM_THRESHOLD:
+        # stream entries so the full object tree never sits in memory at once
+        prefix = 'item' if content.lstrip()[:1] == b'[' else 'value.item'
+        try:
+            return _collect_heart_rate(ijson.items(io.BytesIO(content), prefix, use_float=True), base_date)
+        except Exception:
+            return [], [], []
+    try:
+        data = _json_loads(content)
+    except Exception:
+        return [], [], []
+
+    # data may be {'value': [...]} or a list
+    entries = None
+    if isinstance(data, dict) and 'value' in data:
+        entries = data['value']
+    elif isinstance(data, list):
+        entries = data
+    return _collect_heart_rate(entries or [], base_date)
+
+
+def _collect_heart_rate_nested(entries: list):
+    """Column lists for the usual export schema, or None if `entries` don't all match it.
+
+    The usual schema is full 'dateTime' strings with a nested {'bpm', 'confidence'}
+    value. Checking that once per file lets plain comprehensions replace the
+    per-reading branching of the general loop.
+    """
+    try:
+        dts = [v['dateTime'] for v in entries]
+        vals = [v['value'] for v in entries]
+        bpms = [x.get('bpm') for x in vals]
+        confs = [x.get('confidence') for x in vals]
+        # short times need the file's date prefixed; leave those to the general loop
+        if dts and min(map(len, dts)) <= 8:
+            return None
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return dts, bpms, confs
+
+
+def _collect_heart_rate(entries, base_date: str) -> Tuple[list, list, list]:
+    """Split heart rate entries (any iterable of dicts) into column lists."""
+    if entries.__class__ is list:
+        cols = _collect_heart_rate_nested(entries)
+        if cols is not None:
+            return cols
+    dts, bpms, confs = [], [], []
+    # bound once: this loop runs per reading, millions of times on a full export
+    add_dt, add_bpm, add_conf = dts.append, bpms.append, confs.append
+    for v in entries:
+        get = v.get
+        # v may contain 'dateTime' or 'time'
+        dt = get('dateTime') or get('time')
+        raw = get('value')
+        if raw.__class__ is dict:
+            bpm = raw.get('bpm')
+            conf = raw.get('confidence')
+        else:
+            bpm = get('bpm') or (raw if isinstance(raw, (int, float)) else None)
+            conf = get('confidence')
+
+        if dt and base_date and len(str(dt)) <= 8:
+            dt = f"{base_date}T{dt}"
+
+        add_dt(dt)
+        add_bpm(bpm)
+        add_conf(conf)
+    return dts, bpms, confs
+
+
+def _parse_steps_file(src: str, content: bytes) -> Tuple[list, list]:
+    """Return (dateTimes, steps) from one steps-*.json payload."""
+    dts, vals = [], []
+    try:
+        data = _json_loads(content)
+    except Exception:
+        return dts, vals
+    entries = data.get('value') if isinstance(data, dict) else data
+    base = _extract_date(_basename(src), 'steps-') or ''
+    add_dt, add_val = dts.append, vals.append
+    for v in entries or []:
+        get = v.get
+        dt = get('dateTime') or get('time')
+        val = get('value') or get('steps')
+        if dt and base and len(str(dt)) <= 8:
+            dt = f"{base}T{dt}"
+        add_dt(dt)
+        add_val(val)
+    return dts, vals
+
+
+def _parse_sleep_file(src: str, content: bytes) -> Tuple[list, list, list]:
+    """Return (starts, durations_s, levels) from one sleep-*.json payload."""
+    starts, durations, levels = [], [], []
+    try:
+        data = _json_loads(content)
+    except Exception:
+        return starts, durations, levels
+    if isinstance(data, dict):
+        if 'levels' in data:
+            for rec in data['levels'].get('data', []):
+                starts.append(rec.get('dateTime') or rec.get('start'))
+                durations.append(rec.get('seconds') or rec.get('duration'))
+                levels.append(rec.get('level') or rec.get('stage'))
+        elif 'sleep' in data:
+            for s in data['sleep']:
+                starts.append(s.get('startTime'))
+                durations.append(s.get('durationMillis', 0) / 1000)
+                levels.append(None)
+    return starts, durations, levels
+
+
+# file name pattern -> (kind, parser) for the intraday JSON exports
+_JSON_SOURCES = (
+    ('heart_rate-*.json', 'heart_rate', _parse_heart_rate_file),
+    ('steps-*.json', 'steps', _parse_steps_file),
+    ('sleep-*.json', 'sleep', _parse_sleep_file),
+)
+
+# column names and stacking dtypes of each parser's output
+_COLUMNS = {
+    'heart_rate': (('dateTime', 'bpm', 'confidence'), (object, np.float64, np.float64)),
+    'steps': (('dateTime', 'steps'), (object, np.float64)),
+    'sleep': (('start', 'duration_s', 'level'), (object, np.float64, object)),
+}
+
+
+# one regex for all JSON kinds; the named group that matched is the kind
+_JSON_KIND_MATCH = re.compile(
+    '|'.join(f'(?P<{kind}>{fnmatch.translate(pattern)})' for pattern, kind, _ in _JSON_SOURCES), _GLOB_FLAGS
+).match
+_JSON_PARSERS = {kind: parser for _, kind, parser in _JSON_SOURCES}
+
+
+def _json_kind(name: str):
+    m = _JSON_KIND_MATCH(name)
+    return m.lastgroup if m else None
+
+
+def _as_arrays(kind: str, cols) -> tuple:
+    """Turn a parser's numeric column lists into numpy arrays (None becomes NaN)."""
+    out = []
+    for col, dtype in zip(cols, _COLUMNS[kind][1]):
+        if dtype is not object:
+            try:
+                col = np.asarray(col, dtype=dtype)
+            except (TypeError, ValueError):
+                pass  # stray strings: left for pd.to_numeric to coerce
+        out.append(col)
+    return tuple(out)
+
+
+def _parse_source(src: str, content: bytes):
+    """Parse a JSON payload of any supported kind; returns (src, kind, columns).
+
+    Numeric columns come back as numpy arrays, which leave a worker process as one
+    buffer rather than a pickled list of Python numbers. Unknown names and payloads
+    the parser fails on (e.g. non-dict entries) give (src, None, ()).
+    """
+    kind = _json_kind(_basename(src))
+    if kind is None:
+        return src, None, ()
+    try:
+        return src, kind, _as_arrays(kind, _JSON_PARSERS[kind](src, content))
+    except Exception:
+        return src, None, ()
+
+
+def _prefetch(items, maxsize: int = 8):
+    """Iterate `items` on a background thread, buffering up to `maxsize` of them.
+
+    Reading files and inflating zip members release the GIL, so the next file is
+    fetched while the caller parses the current one. The bound caps memory at a
+    handful of decompressed files.
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _producer():
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                _put(item)
+        except Exception as e:
+            _put(e)
+        finally:
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+            _put(done)
+
+    threading.Thread(target=_producer, daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # unblocks the producer if the consumer stops early
+        stop.set()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# below this many files a cold process pool is not worth starting
+_POOL_MIN_FILES = 16
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all loaders, started on first use (worker start-up is not free).
+
+    Workers are spawned rather than forked: the pool is created from loader threads
+    while prefetch and zip threads are running, and forking those is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker crashed or was killed) so the next call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_files(parser, items, max_workers: int = 1):
+    """Yield `parser(src, content)` for each (src, content) pair, in input order.
+
+    With more than one worker the files are parsed in a process pool, keeping at most
+    two per worker in flight so memory stays bounded; otherwise they are parsed inline.
+    Fewer than _POOL_MIN_FILES files are also parsed inline unless the pool is
+    already running, since starting it costs more than it saves on a small tree.
+    """
+    if max_workers <= 1:
+        for src, content in items:
+            yield parser(src, content)
+        return
+
+    items = iter(items)
+    head = []
+    if _pool is None:
+        head = list(itertools.islice(items, _POOL_MIN_FILES))
+        if len(head) < _POOL_MIN_FILES:
+            for src, content in head:
+                yield parser(src, content)
+            return
+
+    pool = _get_pool(max_workers)
+    pending = collections.deque()
+    try:
+        for src, content in itertools.chain(head, items):
+            pending.append(pool.submit(parser, src, content))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        # this call fails, but the long-lived app must not be stuck with a dead pool
+        _discard_pool(pool)
+        raise
+
+
+def _stack_columns(chunks, dtypes) -> List[np.ndarray]:
+    """Concatenate per-file column lists into one preallocated array per column.
+
+    A column that does not convert to its numeric dtype (stray strings) falls back
+    to object so pd.to_numeric can coerce it later.
+    """
+    total = sum(len(chunk[0]) for chunk in chunks)
+    out = [np.empty(total, dtype=dtype) for dtype in dtypes]
+    pos = 0
+    for chunk in chunks:
+        n = len(chunk[0])
+        for i, col in enumerate(chunk):
+            try:
+                out[i][pos:pos + n] = col
+            except (TypeError, ValueError):
+                out[i] = out[i].astype(object)
+                out[i][pos:pos + n] = col
+        pos += n
+    return out
+
+
+def _frame_from_chunks(kind: str, chunks) -> pd.DataFrame:
+    """Build one DataFrame from a kind's per-file column lists (empty if there are no rows)."""
+    chunks = [c for c in chunks if c and len(c[0])]
+    if not chunks:
+        return pd.DataFrame()
+    names, dtypes = _COLUMNS[kind]
+    return pd.DataFrame(dict(zip(names, _stack_columns(chunks, dtypes))), copy=False)
+
+
+def _compact_heart_rate(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow bpm to Int16 and confidence to Int8; both are small integers and NaNs survive."""
+    for col, dtype in (('bpm', 'Int16'), ('confidence', 'Int8')):
+        if col in df.columns:
+            try:
+                df[col] = pd.to_numeric(df[col], errors='coerce').round().astype(dtype)
+            except Exception:
+                pass
+    return df
+
+
+def _newest_member_time(members, match) -> float:
+    """Epoch time of the newest zip member whose name satisfies `match` (0.0 if none)."""
+    # date_time tuples (Y, M, D, h, m, s) order chronologically, so only the max is converted
+    newest = max((m.date_time for m in members if match(_basename(m.filename))), default=None)
+    if newest is None:
+        return 0.0
+    try:
+        return datetime(*newest).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _source_changed(prev, key: list, mtime: float) -> bool:
+    """Whether a source differs from its processed_sources.json record.
+
+    Records are [size, mtime_ns]; entries from older versions hold a bare mtime
+    and are compared the old way so upgrading does not re-import every source.
+    """
+    if isinstance(prev, list):
+        return prev != key
+    return mtime > (prev or 0)
+
+
+def _appends_in_order(existing: pd.DataFrame, new: pd.DataFrame) -> bool:
+    """True when the sorted `new` frame starts at or after the end of `existing`."""
+    return (not existing.empty and not new.empty
+            and existing.index.is_monotonic_increasing and new.index[0] >= existing.index[-1])
+
+
+def _append_sorted(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate two time-indexed frames, re-sorting only when `new` overlaps `existing`.
+
+    An incremental run normally adds days after the cached range, so the common case
+    is a straight append.
+    """
+    new = new.sort_index(kind='mergesort')
+    if existing.empty:
+        return new
+    if _appends_in_order(existing, new):
+        return pd.concat([existing, new])
+    return pd.concat([existing, new]).sort_index(kind='mergesort')
+
+
+def _write_appended(path, existing_tbl, existing: pd.DataFrame, new: pd.DataFrame, **opts) -> bool:
+    """Write an in-order append as `existing_tbl` + `new` without re-converting the cached rows.
+
+    Returns False (nothing written) when the append would need a re-sort, the schemas
+    differ, or pyarrow is unavailable; the caller then writes the merged frame itself.
+    """
+    if pq is None or existing_tbl is None:
+        return False
+    new = new.sort_index(kind='mergesort')
+    if not _appends_in_order(existing, new):
+        return False
+    try:
+        new_tbl = pa.Table.from_pandas(new, preserve_index=True)
+        if not new_tbl.schema.equals(existing_tbl.schema):
+            return False
+        pq.write_table(pa.concat_tables([existing_tbl, new_tbl]), path, **opts)
+        return True
+    except Exception:
+        return False
+
+
+def derive_ibi(hr: pd.DataFrame) -> pd.DataFrame:
+    """Approximate inter-beat intervals (ms) from a heart rate frame's 'bpm' column."""
+    if hr is None or hr.empty or 'bpm' not in hr.columns:
+        return pd.DataFrame()
+    try:
+        # float32 keeps ~7 significant digits, plenty for millisecond intervals, at half the memory
+        bpm = hr['bpm'].to_numpy(dtype=np.float32, na_value=np.nan)
+    except Exception:
+        return pd.DataFrame()
+    # NaN compares False, so this drops missing and zero readings in one go
+    mask = bpm > 0
+    if mask.all():
+        # to_numpy may hand back the column's own buffer, so divide into a new one
+        ibi = np.divide(np.float32(60000.0), bpm)
+        return pd.DataFrame({'ibi': ibi}, index=hr.index)
+    # bpm[mask] is already a fresh array; divide it in place
+    ibi = bpm[mask]
+    np.divide(np.float32(60000.0), ibi, out=ibi)
+    return pd.DataFrame({'ibi': ibi}, index=hr.index[mask], copy=False)
 
 
 class FitbitLoader:
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, max_workers: int = None, trust_cache: bool = False):
         self.root = Path(root_path)
+        # processes used to parse JSON files; 1 parses inline
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # serve any existing parquet cache without checking the sources
+        self.trust_cache = trust_cache
         self._exists = self.root.exists()
         self._is_dir = self.root.is_dir()
         self._is_zip = self.root.is_file() and self.root.suffix.lower() == '.zip'
         self.progress_log = []
+        # _latest_source_mtime results per pattern set; cleared by refresh_sources()
+        self._mtime_cache: Dict[Tuple[str, ...], float] = {}
+        # zip path -> ((st_mtime_ns, st_size), infolist()); re-read when the zip changes
+        self._zip_index: Dict[str, Tuple[Tuple[int, int], List[zipfile.ZipInfo]]] = {}
+        self._zip_lock = threading.Lock()
+        # _source_signature results per pattern set; cleared by refresh_sources()
+        self._sig_cache: Dict[Tuple[str, ...], str] = {}
+        # (path, name, stat) for every file under the root; built once, cleared by refresh_sources()
+        self._index: List[Tuple[str, str, os.stat_result]] = None
+        self._index_lock = threading.Lock()
+        # time.monotonic() when the index was last built or dropped; the index and
+        # its memos expire _SOURCE_TTL later
+        self._sources_ts = time.monotonic()
+
+    def refresh_sources(self):
+        """Forget the source index and memoised mtimes so the next check rescans the tree."""
+        with self._index_lock:
+            self._index = None
+            self._mtime_cache.clear()
+            self._sig_cache.clear()
+            self._sources_ts = time.monotonic()
+
+    def _expire_sources(self):
+        # a long-lived loader (the app keeps one) still notices new exports after a
+        # short while; memos without a fresh index would only repeat old stats
+        if time.monotonic() - self._sources_ts > _SOURCE_TTL:
+            self.refresh_sources()
+
+    def _source_index(self) -> List[Tuple[str, str, os.stat_result]]:
+        """Return (path, name, stat) for every file under a directory root.
+
+        One scandir walk feeds the freshness checks, the loaders and process_all; it
+        is repeated after `refresh_sources` or once _SOURCE_TTL has passed.
+        """
+        self._expire_sources()
+        with self._index_lock:
+            index = self._index
+            if index is None:
+                index = []
+                if self._is_dir:
+                    for entry in _scan_files(self.root):
+                        try:
+                            index.append((entry.path, entry.name, entry.stat()))
+                        except OSError:
+                            continue
+                self._index = index
+                # memos age from the end of the walk, not its start
+                self._sources_ts = time.monotonic()
+            return index
+
+    def _zip_members(self, zpath: str, st: os.stat_result = None) -> List[zipfile.ZipInfo]:
+        """Return the zip's member list, parsing its central directory at most once per version."""
+        if st is None:
+            st = os.stat(zpath)
+        key = (st.st_mtime_ns, st.st_size)
+        # loaders may run on several threads; parse each central directory once
+        with self._zip_lock:
+            cached = self._zip_index.get(zpath)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            with zipfile.ZipFile(zpath) as zf:
+                members = zf.infolist()
+            self._zip_index[zpath] = (key, members)
+        return members
 
     def _iter_matching_file_contents(self, pattern: str) -> Iterator[Tuple[str, bytes]]:
         """Yield tuples of (source_name, bytes_content) for files matching pattern.
@@ -28,41 +763,36 @@ class FitbitLoader:
         if not self._exists:
             return
 
-        # 1) Files on disk that match directly
+        # 1) Files on disk that match directly, and zip files, in a single pass
         if self._is_dir:
-            for dirpath, _, files in os.walk(self.root):
-                for fname in fnmatch.filter(files, pattern):
-                    p = Path(dirpath) / fname
+            match = _glob_matcher(pattern)
+            is_zip = _glob_matcher('*.zip')
+            for path, name, st in self._source_index():
+                if match(name):
                     try:
-                        yield (str(p), p.read_bytes())
+                        yield (path, _read_file(path))
                     except Exception:
                         continue
-
-            # Also scan zip files inside the directory
-            for dirpath, _, files in os.walk(self.root):
-                for zname in fnmatch.filter(files, '*.zip'):
-                    zpath = Path(dirpath) / zname
+                elif is_zip(name):
                     try:
-                        with zipfile.ZipFile(zpath) as zf:
-                            for member in zf.namelist():
-                                if fnmatch.fnmatch(Path(member).name, pattern):
-                                    try:
-                                        yield (f"{zpath}!{member}", zf.read(member))
-                                    except Exception:
-                                        continue
+                        # consult the cached member list so zips without matches are never opened
+                        members = [m for m in self._zip_members(path, st) if match(_basename(m.filename))]
+                        if not members:
+                            continue
+                        with _open_zip(path) as (zf, mm):
+                            for member, content in _iter_members(zf, mm, members):
+                                yield (f"{path}!{member.filename}", content)
                     except Exception:
                         continue
 
         # 2) Single zip file as root
         if self._is_zip:
             try:
-                with zipfile.ZipFile(self.root) as zf:
-                    for member in zf.namelist():
-                        if fnmatch.fnmatch(Path(member).name, pattern):
-                            try:
-                                yield (f"{self.root}!{member}", zf.read(member))
-                            except Exception:
-                                continue
+                with _open_zip(self.root) as (zf, mm):
+                    match = _glob_matcher(pattern)
+                    members = [m for m in zf.infolist() if match(_basename(m.filename))]
+                    for member, content in _iter_members(zf, mm, members):
+                        yield (f"{self.root}!{member.filename}", content)
             except Exception:
                 return
 
@@ -78,196 +808,283 @@ class FitbitLoader:
     def _processed_metadata_path(self) -> Path:
         return self._cache_dir() / 'processed_sources.json'
 
-    def _load_processed_metadata(self) -> Dict[str, float]:
+    def _load_processed_metadata(self) -> Dict[str, list]:
         p = self._processed_metadata_path()
         if not p.exists():
             return {}
         try:
-            return json.loads(p.read_text(encoding='utf-8'))
+            return _json_loads(p.read_bytes())
         except Exception:
             return {}
 
-    def _save_processed_metadata(self, meta: Dict[str, float]):
+    def _staging_dir(self) -> Path:
+        return self._cache_dir() / 'staging'
+
+    def _stage_batch(self, frames: Dict[str, pd.DataFrame], daily_parts, sources: Dict[str, list]) -> bool:
+        """Write a batch's new rows to staging files, then its manifest; False if that failed."""
+        d = self._staging_dir()
+        batch = str(time.time_ns())
+        files = {}
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            for kind, df in frames.items():
+                if not df.empty:
+                    files[kind] = f'{kind}-{batch}.parquet'
+                    df.to_parquet(d / files[kind])
+            if daily_parts:
+                files['daily'] = f'daily-{batch}.parquet'
+                _concat_csvs(daily_parts).to_parquet(d / files['daily'])
+            # the manifest is written last: a batch without one is ignored
+            _write_atomic(d / f'batch-{batch}.json', json.dumps({'sources': sources, 'files': files}).encode('utf-8'))
+            return True
+        except Exception:
+            return False
+
+    def _load_staged(self, processed: Dict[str, list]):
+        """Rows and sources of batches an interrupted process_all staged but never merged.
+
+        Returns ({kind: [frames]}, {source: key}). A batch whose sources the metadata
+        already records was merged before the run could clean up, and is skipped.
+        """
+        frames = {kind: [] for kind in _CACHE_KINDS}
+        sources = {}
+        d = self._staging_dir()
+        if not d.exists():
+            return frames, sources
+        for manifest in sorted(d.glob('batch-*.json')):
+            try:
+                info = _json_loads(manifest.read_bytes())
+                if all(processed.get(src) == key for src, key in info['sources'].items()):
+                    continue
+                batch = {kind: pd.read_parquet(d / name) for kind, name in info['files'].items()}
+            except Exception:
+                continue  # unreadable: its sources are simply read again
+            for kind, df in batch.items():
+                frames[kind].append(df)
+            sources.update(info['sources'])
+        return frames, sources
+
+    def _save_processed_metadata(self, meta: Dict[str, list]):
         p = self._processed_metadata_path()
         try:
-            p.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+            # machine-read only, so compact
+            if orjson is not None:
+                _write_atomic(p, orjson.dumps(meta))
+            else:
+                _write_atomic(p, json.dumps(meta, separators=(',', ':')).encode('utf-8'))
+        except Exception:
+            pass
+
+    def _cache_meta_path(self, kind: str) -> Path:
+        return self._cache_dir() / f"{kind}.meta.json"
+
+    def _source_signature(self, patterns) -> str:
+        """Hash the relative names and sizes of matching sources and zips.
+
+        Built from directory metadata only, so no zip is opened, and unaffected by
+        copies or restores that only touch mtimes.
+        """
+        self._expire_sources()
+        key = tuple(patterns)
+        # loaders run on threads and refresh_sources() may clear the memo at any time:
+        # one .get() read, and writes under the index lock
+        sig = self._sig_cache.get(key)
+        if sig is not None:
+            return sig
+        entries = []
+        if self._is_dir:
+            match = _glob_matcher(*patterns)
+            is_zip = _glob_matcher('*.zip')
+            for path, name, st in self._source_index():
+                if is_zip(name) or match(name):
+                    entries.append((os.path.relpath(path, self.root), st.st_size))
+        elif self._is_zip:
+            try:
+                entries.append((self.root.name, self.root.stat().st_size))
+            except OSError:
+                pass
+        h = hashlib.blake2b(digest_size=16)
+        for name, size in sorted(entries):
+            h.update(f"{name}:{size}\n".encode('utf-8'))
+        sig = h.hexdigest()
+        with self._index_lock:
+            self._sig_cache[key] = sig
+        return sig
+
+    def _cache_is_current(self, kind: str, patterns) -> bool:
+        """Whether the parquet cache for `kind` still reflects the sources.
+
+        With `trust_cache`, or right after a process_all run, an existing cache is
+        used as is. Otherwise a matching signature sidecar answers without the mtime
+        scan, and failing that the mtime comparison decides and, when fresh, the
+        sidecar is (re)written.
+        """
+        cache_path = self._cache_file(kind)
+        if not cache_path.exists() or cache_path.stat().st_size == 0:
+            return False
+        if self.trust_cache or self._processed_recently():
+            return True
+        sig = self._source_signature(patterns)
+        try:
+            if _json_loads(self._cache_meta_path(kind).read_bytes()).get('signature') == sig:
+                return True
+        except Exception:
+            pass
+        if cache_path.stat().st_mtime < self._latest_source_mtime(patterns):
+            return False
+        self._write_cache_meta(kind, patterns)
+        return True
+
+    def _last_run_path(self) -> Path:
+        # written by process_all after its final merge; its mtime marks the end of the run
+        return self._cache_dir() / 'last_run'
+
+    def _processed_recently(self) -> bool:
+        try:
+            return time.time() - self._last_run_path().stat().st_mtime < _PROCESSED_GRACE
+        except OSError:
+            return False
+
+    def _write_cache_meta(self, kind: str, patterns):
+        try:
+            _write_atomic(self._cache_meta_path(kind), json.dumps({'signature': self._source_signature(patterns)}).encode('utf-8'))
         except Exception:
             pass
 
     def _latest_source_mtime(self, patterns) -> float:
-        """Return latest modification time (epoch) among matching sources and zip members."""
+        """Return latest modification time (epoch) among matching sources and zip members.
+
+        Memoised per pattern set for _SOURCE_TTL seconds; see `refresh_sources`.
+        """
+        self._expire_sources()
+        key = tuple(patterns)
+        cached = self._mtime_cache.get(key)
+        if cached is not None:
+            return cached
         latest = 0.0
+        match = _glob_matcher(*patterns)
         # directory files and zips
         if self._is_dir:
-            for dirpath, _, files in os.walk(self.root):
-                for fname in files:
-                    fpath = Path(dirpath) / fname
-                    try:
-                        if any(fnmatch.fnmatch(fname, p) for p in patterns):
-                            latest = max(latest, fpath.stat().st_mtime)
-                    except Exception:
-                        continue
+            is_zip = _glob_matcher('*.zip')
+            for path, fname, st in self._source_index():
+                if match(fname):
+                    latest = max(latest, st.st_mtime)
                 # check zip members
-                for zname in fnmatch.filter(files, '*.zip'):
-                    zpath = Path(dirpath) / zname
+                if is_zip(fname):
                     try:
-                        with zipfile.ZipFile(zpath) as zf:
-                            for member in zf.infolist():
-                                if any(fnmatch.fnmatch(Path(member.filename).name, p) for p in patterns):
-                                    # zinfo.date_time -> tuple (Y,M,D,H,M,S)
-                                    try:
-                                        dt = datetime(*member.date_time)
-                                        latest = max(latest, dt.timestamp())
-                                    except Exception:
-                                        pass
+                        latest = max(latest, _newest_member_time(self._zip_members(path, st), match))
                     except Exception:
                         continue
 
         if self._is_zip:
             try:
-                with zipfile.ZipFile(self.root) as zf:
-                    for member in zf.infolist():
-                        if any(fnmatch.fnmatch(Path(member.filename).name, p) for p in patterns):
-                            try:
-                                dt = datetime(*member.date_time)
-                                latest = max(latest, dt.timestamp())
-                            except Exception:
-                                pass
+                latest = max(latest, _newest_member_time(self._zip_members(str(self.root)), match))
             except Exception:
                 pass
 
+        with self._index_lock:
+            self._mtime_cache[key] = latest
         return latest
 
     def get_cache_status(self) -> Dict[str, Dict]:
         """Return cache info for supported kinds.
 
-        Returns a dict keyed by kind with values: {'exists', 'size', 'mtime', 'src_mtime', 'fresh'}
+        Returns a dict keyed by kind with values: {'exists', 'size', 'mtime', 'src_mtime', 'fresh'}.
+        'src_mtime' is None unless the freshness check had to scan source mtimes; a
+        trusted cache or a matching signature answers without opening any zip.
         """
-        kinds = {
-            'heart_rate': ['heart_rate-*.json'],
-            'steps': ['steps-*.json'],
-            'sleep': ['sleep-*.json'],
-            'daily': ['*daily*.csv', '*Daily Activity*.csv']
-        }
         info = {}
-        for k, patterns in kinds.items():
+        for k, patterns in _CACHE_KINDS.items():
             p = self._cache_file(k)
             exists = p.exists()
             size = p.stat().st_size if exists else 0
             mtime = p.stat().st_mtime if exists else None
-            src_mtime = self._latest_source_mtime(patterns)
-            fresh = exists and (mtime is not None and mtime >= src_mtime)
+            fresh = exists and self._cache_is_current(k, patterns)
+            src_mtime = self._mtime_cache.get(tuple(patterns))
             info[k] = {'exists': exists, 'size': size, 'mtime': mtime, 'src_mtime': src_mtime, 'fresh': fresh, 'cache_path': str(p)}
         return info
 
+    def _has_sources(self, patterns) -> bool:
+        """Whether any loose file or zip member matches `patterns`."""
+        match = _glob_matcher(*patterns)
+        zips = [str(self.root)] if self._is_zip else []
+        if self._is_dir:
+            is_zip = _glob_matcher('*.zip')
+            for path, name, _ in self._source_index():
+                if match(name):
+                    return True
+                if is_zip(name):
+                    zips.append(path)
+        for zpath in zips:
+            try:
+                if any(match(_basename(m.filename)) for m in self._zip_members(zpath)):
+                    return True
+            except Exception:
+                continue
+        return False
+
     def _discover_files(self, pattern: str):
         if not self.root.exists():
             return
-        for dirpath, _, files in os.walk(self.root):
-            for fname in fnmatch.filter(files, pattern):
-                yield Path(dirpath) / fname
+        match = _glob_matcher(pattern)
+        for path, name, _ in self._source_index():
+            if match(name):
+                yield Path(path)
 
     def _extract_date_from_filename(self, path: Path):
-        m = re.search(r"(20\d{2}-\d{2}-\d{2})", path.name)
-        return m.group(1) if m else None
+        return _extract_date(path.name)
 
     def load_heart_rate(self) -> pd.DataFrame:
         # use parquet cache when available and fresh
         cache_path = self._cache_file('heart_rate')
-        src_mtime = self._latest_source_mtime(['heart_rate-*.json'])
-        if cache_path.exists() and cache_path.stat().st_mtime >= src_mtime and cache_path.stat().st_size > 0:
+        if self._cache_is_current('heart_rate', ['heart_rate-*.json']):
             try:
                 return pd.read_parquet(cache_path)
             except Exception:
                 pass
 
-        rows = []
-        for src, content in self._iter_matching_file_contents('heart_rate-*.json'):
-            try:
-                text = content.decode('utf-8')
-                data = json.loads(text)
-            except Exception:
-                continue
-
-            # data may be {'value': [...]} or a list
-            entries = None
-            if isinstance(data, dict) and 'value' in data:
-                entries = data['value']
-            elif isinstance(data, list):
-                entries = data
-
-            base_date = self._extract_date_from_filename(Path(src)) or ''
-            if entries:
-                for v in entries:
-                    # v may contain 'dateTime' or 'time'
-                    dt = v.get('dateTime') or v.get('time')
-                    bpm = None
-                    conf = None
-                    if isinstance(v.get('value'), dict):
-                        bpm = v['value'].get('bpm')
-                        conf = v['value'].get('confidence')
-                    else:
-                        bpm = v.get('bpm') or (v.get('value') if isinstance(v.get('value'), (int, float)) else None)
-                        conf = v.get('confidence')
-
-                    if dt and len(str(dt)) <= 8 and base_date:
-                        dt = f"{base_date}T{dt}"
-
-                    rows.append({'dateTime': dt, 'bpm': bpm, 'confidence': conf})
-
-        if not rows:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(rows)
+        # column lists per file, stacked once the total row count is known
+        files = _prefetch(self._iter_matching_file_contents('heart_rate-*.json'))
+        df = _frame_from_chunks('heart_rate', (cols for _, _, cols in _map_files(_parse_source, files, self.max_workers)))
+        if df.empty:
+            return df
         df = df.dropna(subset=['dateTime'])
 
         # fast path: try a few common formats first to avoid slow dateutil fallback
         df['dateTime'] = self._parse_datetime_series(df['dateTime'])
 
         df = df.dropna(subset=['dateTime'])
-        df = df.set_index('dateTime').sort_index()
-        if 'bpm' in df.columns:
-            df['bpm'] = pd.to_numeric(df['bpm'], errors='coerce')
+        # each file is already a time-ordered run; the stable (tim)sort merges runs instead of re-sorting
+        df = df.set_index('dateTime').sort_index(kind='mergesort')
+        df = _compact_heart_rate(df)
         # write parquet cache
         try:
-            df.to_parquet(cache_path, index=True)
+            df.to_parquet(cache_path, index=True, **_HR_PARQUET_OPTS)
+            self._write_cache_meta('heart_rate', ['heart_rate-*.json'])
         except Exception:
             pass
         return df
 
     def load_steps(self) -> pd.DataFrame:
         cache_path = self._cache_file('steps')
-        src_mtime = self._latest_source_mtime(['steps-*.json'])
-        if cache_path.exists() and cache_path.stat().st_mtime >= src_mtime and cache_path.stat().st_size > 0:
+        if self._cache_is_current('steps', ['steps-*.json']):
             try:
                 return pd.read_parquet(cache_path)
             except Exception:
                 pass
 
-        rows = []
-        for src, content in self._iter_matching_file_contents('steps-*.json'):
-            try:
-                data = json.loads(content.decode('utf-8'))
-            except Exception:
-                continue
-            entries = data.get('value') if isinstance(data, dict) else data
-            base = self._extract_date_from_filename(Path(src)) or ''
-            for v in entries or []:
-                dt = v.get('dateTime') or v.get('time')
-                val = v.get('value') or v.get('steps')
-                if dt and len(str(dt)) <= 8 and base:
-                    dt = f"{base}T{dt}"
-                rows.append({'dateTime': dt, 'steps': val})
-
-        if not rows:
-            return pd.DataFrame()
-        df = pd.DataFrame(rows)
-        df['dateTime'] = pd.to_datetime(df['dateTime'], errors='coerce')
-        df = df.dropna(subset=['dateTime']).set_index('dateTime').sort_index()
+        files = _prefetch(self._iter_matching_file_contents('steps-*.json'))
+        df = _frame_from_chunks('steps', (cols for _, _, cols in _map_files(_parse_source, files, self.max_workers)))
+        if df.empty:
+            return df
+        df['dateTime'] = self._parse_datetime_series(df['dateTime'])
+        df = df.dropna(subset=['dateTime']).set_index('dateTime').sort_index(kind='mergesort')
         if 'steps' in df.columns:
-            df['steps'] = pd.to_numeric(df['steps'], errors='coerce').fillna(0).astype(int)
+            # per-minute counts fit easily; int32 halves the column next to int64
+            df['steps'] = pd.to_numeric(df['steps'], errors='coerce').fillna(0).astype('int32')
         try:
             df.to_parquet(cache_path, index=True)
+            self._write_cache_meta('steps', ['steps-*.json'])
         except Exception:
             pass
         return df
@@ -275,75 +1092,50 @@ class FitbitLoader:
     def load_sleep(self) -> pd.DataFrame:
         # Collect sleep sessions from sleep-*.json
         cache_path = self._cache_file('sleep')
-        src_mtime = self._latest_source_mtime(['sleep-*.json'])
-        if cache_path.exists() and cache_path.stat().st_mtime >= src_mtime and cache_path.stat().st_size > 0:
+        if self._cache_is_current('sleep', ['sleep-*.json']):
             try:
                 return pd.read_parquet(cache_path)
             except Exception:
                 pass
 
-        sessions = []
-        for src, content in self._iter_matching_file_contents('sleep-*.json'):
-            try:
-                data = json.loads(content.decode('utf-8'))
-            except Exception:
-                continue
-            if isinstance(data, dict):
-                if 'levels' in data:
-                    levels = data['levels']
-                    for rec in levels.get('data', []):
-                        start = rec.get('dateTime') or rec.get('start')
-                        duration = rec.get('seconds') or rec.get('duration')
-                        sessions.append({'start': start, 'duration_s': duration, 'level': rec.get('level') or rec.get('stage')})
-                elif 'sleep' in data:
-                    for s in data['sleep']:
-                        sessions.append({'start': s.get('startTime'), 'duration_s': s.get('durationMillis', 0) / 1000, 'level': None})
-
-        if not sessions:
-            return pd.DataFrame()
-        df = pd.DataFrame(sessions)
-        df['start'] = pd.to_datetime(df['start'], errors='coerce')
-        df = df.dropna(subset=['start']).sort_values('start')
+        files = _prefetch(self._iter_matching_file_contents('sleep-*.json'))
+        df = _frame_from_chunks('sleep', (cols for _, _, cols in _map_files(_parse_source, files, self.max_workers)))
+        if df.empty:
+            return df
+        df['start'] = self._parse_datetime_series(df['start'])
+        df = df.dropna(subset=['start']).sort_values('start', kind='mergesort')
+        # a handful of stage names: categorical lets pyarrow dictionary-encode them
+        df['level'] = df['level'].astype('category')
         try:
-            df.to_parquet(cache_path, index=False)
+            df.to_parquet(cache_path, index=False, **_SLEEP_PARQUET_OPTS)
+            self._write_cache_meta('sleep', ['sleep-*.json'])
         except Exception:
             pass
         return df
 
     def load_daily_summary(self) -> pd.DataFrame:
+        # use parquet cache when available and fresh, before reading any CSV
+        cache_path = self._cache_file('daily')
+        if self._cache_is_current('daily', ['*daily*.csv','*Daily Activity*.csv']):
+            try:
+                return pd.read_parquet(cache_path)
+            except Exception:
+                pass
+
         # look for Daily Activity Summary.csv and Sleep Score.csv
         dfs = []
-        # local CSV files
-        if self._is_dir:
-            for dirpath, _, files in os.walk(self.root):
-                for fname in files:
-                    if fname.lower().endswith('.csv') and 'daily' in fname.lower():
-                        p = Path(dirpath) / fname
-                        try:
-                            dfs.append(pd.read_csv(p))
-                        except Exception:
-                            continue
-
-        # CSVs inside zip files
+        # loose CSVs and CSVs inside zip files, in one pass over the tree
         for src, content in self._iter_matching_file_contents('*.csv'):
-            name = Path(src).name.lower()
+            name = _basename(src).lower()
             if 'daily' in name or 'sleep' in name:
                 try:
-                    dfs.append(pd.read_csv(io.BytesIO(content)))
+                    dfs.append(_read_csv(content))
                 except Exception:
                     continue
 
-        cache_path = self._cache_file('daily')
-        src_mtime = self._latest_source_mtime(['*daily*.csv','*Daily Activity*.csv'])
-        if cache_path.exists() and cache_path.stat().st_mtime >= src_mtime and cache_path.stat().st_size > 0:
-            try:
-                return pd.read_parquet(cache_path)
-            except Exception:
-                pass
-
         if not dfs:
             return pd.DataFrame()
-        df = pd.concat(dfs, ignore_index=True)
+        df = _concat_csvs(dfs)
         # try to standardize date column
         for c in df.columns:
             if 'date' in c.lower():
@@ -352,67 +1144,98 @@ class FitbitLoader:
                 break
         try:
             df.to_parquet(cache_path, index=True)
+            self._write_cache_meta('daily', ['*daily*.csv','*Daily Activity*.csv'])
         except Exception:
             pass
         return df
 
     def _parse_datetime_series(self, series) -> pd.Series:
-        """Attempt fast vectorized parsing using common formats before falling back.
+        """Parse timestamps with pandas' ISO 8601 fast path, falling back only for the misses.
 
-        Returns a pd.Series of datetimes (na for unparsable).
+        Fitbit JSON timestamps are ISO shaped (with or without fractional seconds), so
+        one vectorised pass normally parses everything. Anything left over (e.g. the
+        older 'MM/DD/YY HH:MM:SS' exports) goes through format inference, then
+        per-element parsing. Returns a pd.Series of datetimes (NaT for unparsable).
         """
-        s = pd.Series(series).astype(str)
-        # try common ISO formats in order (with/without microseconds)
-        formats = [
-            '%Y-%m-%dT%H:%M:%S.%f',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-            '%H:%M:%S',
-            '%H:%M'
-        ]
-
-        parsed = pd.Series([pd.NaT] * len(s), index=s.index)
-        remaining_mask = parsed.isna()
-
-        for fmt in formats:
+        series = pd.Series(series)
+        # parse each distinct value once: overlapping exports repeat the same timestamps,
+        # and only the uniques need converting to str
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        index = series.index
+        s = pd.Series(uniques).astype(str)
+        try:
+            values = pd.to_datetime(s, format='ISO8601', errors='coerce').to_numpy()
+        except Exception:
+            values = np.full(len(s), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+        missing = pd.isna(values)
+        if missing.any():
+            rest = s[missing]
+            with warnings.catch_warnings():
+                # inference failing over to dateutil is expected here, not worth a warning
+                warnings.simplefilter('ignore', UserWarning)
+                try:
+                    fallback = pd.to_datetime(rest, errors='coerce')
+                except Exception:
+                    fallback = pd.Series(pd.NaT, index=rest.index, dtype='datetime64[ns]')
+                if fallback.isna().any():
+                    try:
+                        mixed = pd.to_datetime(rest[fallback.isna()], format='mixed', errors='coerce')
+                        fallback = fallback.fillna(mixed)
+                    except Exception:
+                        pass
+            # positional write into the uniques' array; no index alignment
+            fallback = fallback.to_numpy()
+            if not values.flags.writeable:
+                values = values.copy()
             try:
-                candidate = pd.to_datetime(s.where(remaining_mask), format=fmt, errors='coerce')
-            except Exception:
-                candidate = pd.to_datetime(s.where(remaining_mask), errors='coerce')
-            # fill parsed where candidate is not NA
-            ok = candidate.notna()
-            if ok.any():
-                parsed.loc[ok.index[ok]] = candidate.loc[ok.index[ok]]
-                remaining_mask = parsed.isna()
-            if not remaining_mask.any():
-                break
+                values[missing] = fallback
+            except (TypeError, ValueError):
+                values = values.astype(object)
+                values[missing] = fallback
 
-        # final fallback for anything left: let pandas try to infer (slower)
-        if parsed.isna().any():
-            try:
-                fallback = pd.to_datetime(s.where(parsed.isna()), errors='coerce')
-                parsed.loc[fallback.notna().index[fallback.notna()]] = fallback.loc[fallback.notna().index[fallback.notna()]]
-            except Exception:
-                pass
+        return pd.Series(values[codes], index=index)
 
-        return parsed
     def process_all(self, progress_callback=None) -> Dict[str, pd.DataFrame]:
         """
         Incrementally process available sources (files and zip archives) and append to parquet caches.
 
         If `progress_callback` is provided it will be called with two args: (source_name, message).
-        A running `self.progress_log` list of tuples (timestamp, source, message) is maintained.
+        `self.progress_log` holds the records ({'ts', 'source', 'msg'}) of the latest run
+        only; the app keeps one loader for the server's lifetime, so it must not grow
+        across runs.
         """
+        self.progress_log = []
         # Load metadata of already processed sources
         processed = self._load_processed_metadata()
-
-        # Prepare holders for newly parsed rows
-        new_hr_rows = []
-        new_steps_rows = []
-        new_sleep_sessions = []
+        # caches are about to change: stop trusting them until this run has merged
+        try:
+            self._last_run_path().unlink()
+        except OSError:
+            pass
+        # batches staged by an interrupted run are merged by this one, not re-read
+        staged, staged_sources = self._load_staged(processed)
+        processed.update(staged_sources)
+        # index the tree afresh; everything below shares that one walk
+        self.refresh_sources()
+
+        # new rows per kind (frames) and daily CSV parts to merge at the end, and the
+        # sources to record once they are merged
+        pending = {kind: staged[kind] for kind in ('heart_rate', 'steps', 'sleep')}
+        pending_daily = staged['daily']
+        recorded = dict(staged_sources)
+
+        # Prepare holders for newly parsed rows: per-kind (source, column lists), one
+        # entry per file, and (source, frame) per daily CSV
+        chunks = {'heart_rate': [], 'steps': [], 'sleep': []}
         new_daily_dfs = []
+        # a source is recorded as processed only once all its rows are merged: track
+        # which source each payload belongs to and how many are still being parsed
+        owner = {}
+        outstanding = collections.Counter()
+        # (source, key) of fully read sources, in order; failed ones are never recorded
+        read_sources = []
+        failed = set()
 
         def _report(src, msg):
             ts = time.time()
@@ -431,279 +1254,285 @@ class FitbitLoader:
             return {'heart_rate': pd.DataFrame(), 'ibi': pd.DataFrame(), 'steps': pd.DataFrame(), 'sleep': pd.DataFrame(), 'daily': pd.DataFrame()}
 
         if self._is_dir:
-            # plain files
-            for dirpath, _, files in os.walk(self.root):
-                for fname in files:
-                    fpath = Path(dirpath) / fname
-                    if fname.lower().endswith('.zip'):
-                        sources.append(fpath)
-                    else:
-                        # include any file that matches our target patterns
-                        if fnmatch.fnmatch(fname, 'heart_rate-*.json') or fnmatch.fnmatch(fname, 'steps-*.json') or fnmatch.fnmatch(fname, 'sleep-*.json') or fname.lower().endswith('.csv'):
-                            sources.append(fpath)
+            # zips plus any file that matches our target patterns, with the mtime
+            # recorded when the tree was indexed
+            for path, fname, st in self._source_index():
+                if fname.lower().endswith(('.zip', '.csv')) or _json_kind(fname):
+                    sources.append((path, st))
         if self._is_zip:
-            sources.append(self.root)
-
-        # Helper to parse json content for heart/steps/sleep
-        def _parse_heart_from_bytes(src_label, content_bytes):
-            try:
-                data = json.loads(content_bytes.decode('utf-8'))
-            except Exception:
-                return []
-            entries = None
-            if isinstance(data, dict) and 'value' in data:
-                entries = data['value']
-            elif isinstance(data, list):
-                entries = data
-            base_date = None
             try:
-                base_date = self._extract_date_from_filename(Path(src_label))
-            except Exception:
-                base_date = None
-            rows = []
-            for v in entries or []:
-                dt = v.get('dateTime') or v.get('time')
-                bpm = None
-                conf = None
-                if isinstance(v.get('value'), dict):
-                    bpm = v['value'].get('bpm')
-                    conf = v['value'].get('confidence')
-                else:
-                    bpm = v.get('bpm') or (v.get('value') if isinstance(v.get('value'), (int, float)) else None)
-                    conf = v.get('confidence')
-                if dt and len(str(dt)) <= 8 and base_date:
-                    dt = f"{base_date}T{dt}"
-                rows.append({'dateTime': dt, 'bpm': bpm, 'confidence': conf})
-            return rows
-
-        def _parse_steps_from_bytes(src_label, content_bytes):
-            try:
-                data = json.loads(content_bytes.decode('utf-8'))
-            except Exception:
-                return []
-            entries = data.get('value') if isinstance(data, dict) else data
-            base = None
-            try:
-                base = self._extract_date_from_filename(Path(src_label))
-            except Exception:
-                base = None
-            rows = []
-            for v in entries or []:
-                dt = v.get('dateTime') or v.get('time')
-                val = v.get('value') or v.get('steps')
-                if dt and len(str(dt)) <= 8 and base:
-                    dt = f"{base}T{dt}"
-                rows.append({'dateTime': dt, 'steps': val})
-            return rows
-
-        def _parse_sleep_from_bytes(src_label, content_bytes):
+                sources.append((str(self.root), self.root.stat()))
+            except OSError:
+                pass
+
+        def _read_daily(src, label, read):
             try:
-                data = json.loads(content_bytes.decode('utf-8'))
+                df = _read_csv(read())
+                new_daily_dfs.append((src, df))
+                _report(label, f"parsed_daily:{len(df)}")
             except Exception:
-                return []
-            sessions = []
-            if isinstance(data, dict):
-                if 'levels' in data:
-                    levels = data['levels']
-                    for rec in levels.get('data', []):
-                        start = rec.get('dateTime') or rec.get('start')
-                        duration = rec.get('seconds') or rec.get('duration')
-                        sessions.append({'start': start, 'duration_s': duration, 'level': rec.get('level') or rec.get('stage')})
-                elif 'sleep' in data:
-                    for s in data['sleep']:
-                        sessions.append({'start': s.get('startTime'), 'duration_s': s.get('durationMillis', 0) / 1000, 'level': None})
-            return sessions
-
-        # Process each source incrementally
-        for src in sources:
-            try:
-                src_key = str(src)
-                try:
-                    src_mtime = Path(src).stat().st_mtime
-                except Exception:
-                    src_mtime = time.time()
-                prev_mtime = processed.get(src_key, 0)
-                if src_mtime <= prev_mtime:
-                    _report(src_key, 'skipped')
-                    continue
+                _report(label, 'parsed_daily:0')
 
-                # if zip, iterate members
-                if str(src).lower().endswith('.zip'):
-                    try:
-                        with zipfile.ZipFile(src) as zf:
-                            for member in zf.namelist():
-                                name = Path(member).name
-                                try:
-                                    content = zf.read(member)
-                                except Exception:
-                                    continue
-                                if fnmatch.fnmatch(name, 'heart_rate-*.json'):
-                                    rows = _parse_heart_from_bytes(f"{src}!{member}", content)
-                                    new_hr_rows.extend(rows)
-                                    _report(f"{src}!{member}", f"parsed:{len(rows)}")
-                                elif fnmatch.fnmatch(name, 'steps-*.json'):
-                                    rows = _parse_steps_from_bytes(f"{src}!{member}", content)
-                                    new_steps_rows.extend(rows)
-                                    _report(f"{src}!{member}", f"parsed:{len(rows)}")
-                                elif fnmatch.fnmatch(name, 'sleep-*.json'):
-                                    rows = _parse_sleep_from_bytes(f"{src}!{member}", content)
-                                    new_sleep_sessions.extend(rows)
-                                    _report(f"{src}!{member}", f"parsed_sleep:{len(rows)}")
-                                elif name.lower().endswith('.csv') and ('daily' in name.lower() or 'sleep' in name.lower()):
-                                    try:
-                                        df = pd.read_csv(io.BytesIO(content))
-                                        new_daily_dfs.append(df)
-                                        _report(f"{src}!{member}", f"parsed_daily:{len(df)}")
-                                    except Exception:
-                                        _report(f"{src}!{member}", 'parsed_daily:0')
-                    except Exception as e:
-                        _report(src_key, f'zip_error:{e}')
-                        continue
-                else:
-                    # plain file
-                    name = Path(src).name
-                    try:
-                        content = Path(src).read_bytes()
-                    except Exception:
-                        _report(src_key, 'read_error')
+        def _payloads():
+            """Yield (label, bytes) for each JSON payload of new sources; CSVs are read inline."""
+            for src, st in sources:
+                try:
+                    key = [st.st_size, st.st_mtime_ns]
+                    if not _source_changed(processed.get(src), key, st.st_mtime):
+                        _report(src, 'skipped')
                         continue
-                    if fnmatch.fnmatch(name, 'heart_rate-*.json'):
-                        rows = _parse_heart_from_bytes(src_key, content)
-                        new_hr_rows.extend(rows)
-                        _report(src_key, f'parsed:{len(rows)}')
-                    elif fnmatch.fnmatch(name, 'steps-*.json'):
-                        rows = _parse_steps_from_bytes(src_key, content)
-                        new_steps_rows.extend(rows)
-                        _report(src_key, f'parsed:{len(rows)}')
-                    elif fnmatch.fnmatch(name, 'sleep-*.json'):
-                        rows = _parse_sleep_from_bytes(src_key, content)
-                        new_sleep_sessions.extend(rows)
-                        _report(src_key, f'parsed_sleep:{len(rows)}')
-                    elif name.lower().endswith('.csv') and ('daily' in name.lower() or 'sleep' in name.lower()):
+
+                    # if zip, iterate members
+                    if src.lower().endswith('.zip'):
                         try:
-                            df = pd.read_csv(io.BytesIO(content))
-                            new_daily_dfs.append(df)
-                            _report(src_key, f'parsed_daily:{len(df)}')
-                        except Exception:
-                            _report(src_key, 'parsed_daily:0')
-
-                # mark processed
-                processed[src_key] = src_mtime
-                self._save_processed_metadata(processed)
-                _report(src_key, 'processed')
-            except Exception as e:
-                _report(src, f'error:{e}')
-
-        # Now merge new rows into caches
-        # Heart rate
+                            with _open_zip(src) as (zf, mm):
+                                json_members = []
+                                for member in zf.infolist():
+                                    name = _basename(member.filename)
+                                    if _json_kind(name):
+                                        json_members.append(member)
+                                    elif name.lower().endswith('.csv') and ('daily' in name.lower() or 'sleep' in name.lower()):
+                                        _read_daily(src, f"{src}!{member.filename}", lambda: _read_member(zf, mm, member))
+                                # JSON members are inflated on several threads at once
+                                for member, content in _iter_members(zf, mm, json_members):
+                                    label = f"{src}!{member.filename}"
+                                    owner[label] = src
+                                    outstanding[src] += 1
+                                    yield label, content
+                        except Exception as e:
+                            failed.add(src)
+                            _report(src, f'zip_error:{e}')
+                            continue
+                    else:
+                        # plain file
+                        name = _basename(src)
+                        if _json_kind(name):
+                            try:
+                                content = _read_file(src)
+                            except Exception:
+                                _report(src, 'read_error')
+                                continue
+                            owner[src] = src
+                            outstanding[src] += 1
+                            yield src, content
+                        elif name.lower().endswith('.csv') and ('daily' in name.lower() or 'sleep' in name.lower()):
+                            _read_daily(src, src, lambda: _read_file(src))
+
+                    # recorded in processed_sources.json once its rows are merged
+                    read_sources.append((src, key))
+                    _report(src, 'processed')
+                except Exception as e:
+                    failed.add(src)
+                    _report(src, f'error:{e}')
+
+        def _take(items, batch):
+            """Remove and return the parts of `batch` sources; parts of failed sources are dropped."""
+            keep, taken = [], []
+            for src, part in items:
+                if src in failed:
+                    continue
+                if src in batch:
+                    taken.append(part)
+                else:
+                    keep.append((src, part))
+            items[:] = keep
+            return taken
+
+        def _stage_ready(final=False):
+            """Move sources whose payloads are all parsed into the end-of-run merge.
+
+            Results arrive in input order, so the finished sources are a prefix of
+            `read_sources`. Mid-run this waits for _META_FLUSH_EVERY of them and also
+            writes them to a staging batch, so an interrupted run keeps their rows; the
+            caches themselves are rewritten once, at the end.
+            """
+            n = 0
+            while n < len(read_sources) and not outstanding[read_sources[n][0]]:
+                n += 1
+            if not final and n < _META_FLUSH_EVERY:
+                return
+            batch = dict(read_sources[:n])
+            del read_sources[:n]
+            frames = {kind: _frame_from_chunks(kind, _take(parts, batch)) for kind, parts in chunks.items()}
+            daily = _take(new_daily_dfs, batch)
+            if not final:
+                self._stage_batch(frames, daily, batch)
+            for kind, df in frames.items():
+                if not df.empty:
+                    pending[kind].append(df)
+            pending_daily.extend(daily)
+            recorded.update(batch)
+
+        # JSON payloads are parsed in the shared process pool, results arrive in order.
+        # If this raises, only the staged batches survive; the rest is re-read next run.
+        for label, kind, cols in _map_files(_parse_source, _payloads(), self.max_workers):
+            src = owner.pop(label)
+            outstanding[src] -= 1
+            if kind is None:
+                # a malformed payload stays malformed until its source changes, so the
+                # rest of the source is still merged and the source recorded
+                _report(label, 'error:unparsable')
+            else:
+                chunks[kind].append((src, cols))
+                _report(label, f"{'parsed_sleep' if kind == 'sleep' else 'parsed'}:{len(cols[0])}")
+            _stage_ready()
+        _stage_ready(final=True)
+
+        results = self._merge_new(
+            {kind: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame() for kind, frames in pending.items()},
+            pending_daily,
+        )
+        if recorded:
+            processed.update(recorded)
+            self._save_processed_metadata(processed)
+        # recorded now, so the staged batches are merged and no longer needed
+        shutil.rmtree(self._staging_dir(), ignore_errors=True)
+        try:
+            _write_atomic(self._last_run_path(), b'')
+        except Exception:
+            pass
+        return results
+
+    def _merge_new(self, frames: Dict[str, pd.DataFrame], daily_dfs) -> Dict[str, pd.DataFrame]:
+        """Merge new per-kind frames and daily CSVs into the caches; returns the merged frames."""
+        # each kind merges into its own cache file, so the four merges run side by side
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            hr_fut = ex.submit(self._merge_heart_rate, frames['heart_rate'])
+            steps_fut = ex.submit(self._merge_steps, frames['steps'])
+            sleep_fut = ex.submit(self._merge_sleep, frames['sleep'])
+            daily_fut = ex.submit(self._merge_daily, daily_dfs)
+            merged = hr_fut.result()
+            ibi = derive_ibi(merged)
+
+        return {
+            'heart_rate': merged,
+            'ibi': ibi,
+            'steps': steps_fut.result(),
+            'sleep': sleep_fut.result(),
+            'daily': daily_fut.result(),
+        }
+
+    def _read_cache(self, kind: str) -> pd.DataFrame:
+        path = self._cache_file(kind)
+        try:
+            return pd.read_parquet(path) if path.exists() and path.stat().st_size > 0 else pd.DataFrame()
+        except Exception:
+            return pd.DataFrame()
+
+    def _read_cache_table(self, kind: str):
+        """Cached frame for `kind` plus its Arrow table (None without pyarrow), read once."""
+        if pq is None:
+            return self._read_cache(kind), None
+        path = self._cache_file(kind)
+        try:
+            if path.exists() and path.stat().st_size > 0:
+                tbl = pq.read_table(path)
+                return tbl.to_pandas(), tbl
+        except Exception:
+            pass
+        return pd.DataFrame(), None
+
+    def _merge_heart_rate(self, hr_new_df: pd.DataFrame) -> pd.DataFrame:
         hr_cache = self._cache_file('heart_rate')
+        existing_hr, existing_tbl = self._read_cache_table('heart_rate')
+        if hr_new_df.empty:
+            return existing_hr
+        hr_new_df['dateTime'] = self._parse_datetime_series(hr_new_df['dateTime'])
+        hr_new_df = hr_new_df.dropna(subset=['dateTime']).set_index('dateTime')
+        hr_new_df = _compact_heart_rate(hr_new_df)
+        merged = _append_sorted(existing_hr, hr_new_df)
+        if not existing_hr.empty and not existing_hr.dtypes.equals(hr_new_df.dtypes):
+            # caches written before the compact dtypes still need narrowing
+            merged = _compact_heart_rate(merged)
         try:
-            existing_hr = pd.read_parquet(hr_cache) if hr_cache.exists() and hr_cache.stat().st_size > 0 else pd.DataFrame()
+            if not _write_appended(hr_cache, existing_tbl, existing_hr, hr_new_df, **_HR_PARQUET_OPTS):
+                merged.to_parquet(hr_cache, **_HR_PARQUET_OPTS)
         except Exception:
-            existing_hr = pd.DataFrame()
-        hr_new_df = pd.DataFrame(new_hr_rows)
-        if not hr_new_df.empty:
-            hr_new_df['dateTime'] = self._parse_datetime_series(hr_new_df['dateTime'])
-            hr_new_df = hr_new_df.dropna(subset=['dateTime']).set_index('dateTime')
-            hr_new_df['bpm'] = pd.to_numeric(hr_new_df['bpm'], errors='coerce')
-            if not existing_hr.empty:
-                merged = pd.concat([existing_hr, hr_new_df]).sort_index()
-            else:
-                merged = hr_new_df.sort_index()
-            try:
-                merged.to_parquet(hr_cache)
-            except Exception:
-                pass
-        else:
-            merged = existing_hr
+            pass
+        return merged
 
-        # Steps
+    def _merge_steps(self, steps_new_df: pd.DataFrame) -> pd.DataFrame:
         steps_cache = self._cache_file('steps')
+        existing_steps, existing_tbl = self._read_cache_table('steps')
+        if steps_new_df.empty:
+            return existing_steps
+        steps_new_df['dateTime'] = self._parse_datetime_series(steps_new_df['dateTime'])
+        steps_new_df = steps_new_df.dropna(subset=['dateTime']).set_index('dateTime')
+        steps_new_df['steps'] = pd.to_numeric(steps_new_df['steps'], errors='coerce').fillna(0).astype('int32')
+        merged_steps = _append_sorted(existing_steps, steps_new_df)
+        if not existing_steps.empty and not existing_steps.dtypes.equals(steps_new_df.dtypes):
+            # caches written with int64 steps are narrowed once, then append as Arrow tables
+            merged_steps['steps'] = merged_steps['steps'].astype('int32')
         try:
-            existing_steps = pd.read_parquet(steps_cache) if steps_cache.exists() and steps_cache.stat().st_size > 0 else pd.DataFrame()
-        except Exception:
-            existing_steps = pd.DataFrame()
-        steps_new_df = pd.DataFrame(new_steps_rows)
-        if not steps_new_df.empty:
-            steps_new_df['dateTime'] = pd.to_datetime(steps_new_df['dateTime'], errors='coerce')
-            steps_new_df = steps_new_df.dropna(subset=['dateTime']).set_index('dateTime')
-            steps_new_df['steps'] = pd.to_numeric(steps_new_df['steps'], errors='coerce').fillna(0).astype(int)
-            if not existing_steps.empty:
-                merged_steps = pd.concat([existing_steps, steps_new_df]).sort_index()
-            else:
-                merged_steps = steps_new_df.sort_index()
-            try:
+            if not _write_appended(steps_cache, existing_tbl, existing_steps, steps_new_df):
                 merged_steps.to_parquet(steps_cache)
-            except Exception:
-                pass
-        else:
-            merged_steps = existing_steps
+        except Exception:
+            pass
+        return merged_steps
 
-        # Sleep
+    def _merge_sleep(self, sleep_new_df: pd.DataFrame) -> pd.DataFrame:
         sleep_cache = self._cache_file('sleep')
+        existing_sleep = self._read_cache('sleep')
+        if sleep_new_df.empty:
+            return existing_sleep
+        sleep_new_df['start'] = self._parse_datetime_series(sleep_new_df['start'])
+        sleep_new_df = sleep_new_df.dropna(subset=['start']).sort_values('start', kind='mergesort')
+        if not existing_sleep.empty:
+            merged_sleep = pd.concat([existing_sleep, sleep_new_df], ignore_index=True)
+            merged_sleep = merged_sleep.drop_duplicates().sort_values('start', kind='mergesort')
+        else:
+            merged_sleep = sleep_new_df
+        merged_sleep['level'] = merged_sleep['level'].astype('category')
         try:
-            existing_sleep = pd.read_parquet(sleep_cache) if sleep_cache.exists() and sleep_cache.stat().st_size > 0 else pd.DataFrame()
+            merged_sleep.to_parquet(sleep_cache, index=False, **_SLEEP_PARQUET_OPTS)
         except Exception:
-            existing_sleep = pd.DataFrame()
-        sleep_new_df = pd.DataFrame(new_sleep_sessions)
-        if not sleep_new_df.empty:
-            sleep_new_df['start'] = pd.to_datetime(sleep_new_df['start'], errors='coerce')
-            sleep_new_df = sleep_new_df.dropna(subset=['start']).sort_values('start')
-            if not existing_sleep.empty:
-                merged_sleep = pd.concat([existing_sleep, sleep_new_df], ignore_index=True)
-                merged_sleep = merged_sleep.drop_duplicates().sort_values('start')
-            else:
-                merged_sleep = sleep_new_df
-            try:
-                merged_sleep.to_parquet(sleep_cache, index=False)
-            except Exception:
-                pass
-        else:
-            merged_sleep = existing_sleep
+            pass
+        return merged_sleep
 
-        # Daily
+    def _merge_daily(self, new_daily_dfs) -> pd.DataFrame:
         daily_cache = self._cache_file('daily')
+        existing_daily = self._read_cache('daily')
+        if not new_daily_dfs:
+            return existing_daily
         try:
-            existing_daily = pd.read_parquet(daily_cache) if daily_cache.exists() and daily_cache.stat().st_size > 0 else pd.DataFrame()
+            concat_daily = _concat_csvs(new_daily_dfs)
         except Exception:
-            existing_daily = pd.DataFrame()
-        if new_daily_dfs:
-            try:
-                concat_daily = pd.concat(new_daily_dfs, ignore_index=True)
-            except Exception:
-                concat_daily = pd.DataFrame()
-            if not concat_daily.empty:
-                if not existing_daily.empty:
-                    merged_daily = pd.concat([existing_daily, concat_daily], ignore_index=True).drop_duplicates()
-                else:
-                    merged_daily = concat_daily
-                try:
-                    merged_daily.to_parquet(daily_cache, index=True)
-                except Exception:
-                    pass
-            else:
-                merged_daily = existing_daily
+            concat_daily = pd.DataFrame()
+        if concat_daily.empty:
+            return existing_daily
+        if not existing_daily.empty:
+            merged_daily = pd.concat([existing_daily, concat_daily], ignore_index=True).drop_duplicates()
         else:
-            merged_daily = existing_daily
-
-        # derive IBI
-        ibi_df = pd.DataFrame()
+            merged_daily = concat_daily
         try:
-            if not merged.empty and 'bpm' in merged.columns:
-                ibi = 60000.0 / merged['bpm'].replace({0: None})
-                ibi = ibi.dropna()
-                ibi_df = pd.DataFrame({'ibi': ibi.astype(float)})
-                ibi_df.index = ibi.index
+            merged_daily.to_parquet(daily_cache, index=True)
         except Exception:
-            ibi_df = pd.DataFrame()
+            pass
+        return merged_daily
 
-        return {
-            'heart_rate': merged,
-            'ibi': ibi_df,
-            'steps': merged_steps,
-            'sleep': merged_sleep,
-            'daily': merged_daily,
-        }
+    def load_cached(self):
+        """Return all cached frames when every parquet cache is fresh, else None.
+
+        Lets callers skip `process_all` (and its source scan) on a cold start. A kind
+        with no cache and no matching sources (e.g. an export without sleep data)
+        comes back as an empty frame, since nothing would ever write its cache.
+        """
+        status = self.get_cache_status()
+        dfs = {}
+        try:
+            for k, v in status.items():
+                if not (v['exists'] and v['size'] > 0):
+                    if self._has_sources(_CACHE_KINDS[k]):
+                        return None
+                    dfs[k] = pd.DataFrame()
+                elif not v['fresh']:
+                    return None
+                else:
+                    dfs[k] = pd.read_parquet(v['cache_path'], engine='pyarrow')
+        except Exception:
+            return None
+        dfs['ibi'] = derive_ibi(dfs['heart_rate'])
+        return dfs
 
     def get_progress_log(self):
         return list(self.progress_log)
@@ -724,25 +1553,19 @@ class FitbitLoader:
         try:
             if self._is_dir:
                 # List all files in directory
-                for dirpath, _, files in os.walk(self.root):
-                    for fname in files:
-                        fpath = Path(dirpath) / fname
-                        try:
-                            size = fpath.stat().st_size
-                            if fname.lower().endswith('.zip'):
-                                info['zip_files'].append({
-                                    'name': fname,
-                                    'path': str(fpath),
-                                    'size': size
-                                })
-                            elif fname.lower().endswith(('.json', '.csv')):
-                                info['data_files'].append({
-                                    'name': fname,
-                                    'path': str(fpath),
-                                    'size': size
-                                })
-                        except Exception:
-                            pass
+                for path, fname, st in self._source_index():
+                    if fname.lower().endswith('.zip'):
+                        info['zip_files'].append({
+                            'name': fname,
+                            'path': path,
+                            'size': st.st_size
+                        })
+                    elif fname.lower().endswith(('.json', '.csv')):
+                        info['data_files'].append({
+                            'name': fname,
+                            'path': path,
+                            'size': st.st_size
+                        })
             elif self._is_zip:
                 # Single zip file
                 info['zip_files'].append({
@@ -2,6 +2,9 @@ import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 
+# a Poincaré cloud looks the same beyond this many points
+_POINCARE_MAX_POINTS = 200_000
+
 
 def plot_polar_activity(df: pd.DataFrame) -> go.Figure:
     # expects df with DatetimeIndex and 'bpm' or 'steps'
@@ -19,15 +22,14 @@ def plot_polar_activity(df: pd.DataFrame) -> go.Figure:
         series = df.iloc[:, 0]
 
     samp = series.resample('15min').mean().fillna(0)
-    times = samp.index.time
-    dates = samp.index.date
+    idx = samp.index
 
     # Map time to degrees
-    degrees = np.array([t.hour * 15 + t.minute * 0.25 for t in times]) % 360
-    # Map dates to radial values (ordinal)
-    unique_dates = np.unique(dates)
-    date_to_r = {d: i + 1 for i, d in enumerate(unique_dates)}
-    r = np.array([date_to_r[d] for d in dates])
+    degrees = (idx.hour.to_numpy() * 15 + idx.minute.to_numpy() * 0.25) % 360
+    # Map dates to radial values (ordinal); the resampled index is sorted, so
+    # factorize's first-seen codes are the date ranks
+    codes, _ = pd.factorize(idx.normalize())
+    r = codes + 1
 
     fig = go.Figure(go.Barpolar(r=r, theta=degrees, marker=dict(color=samp, colorscale='Viridis', showscale=True), opacity=0.9))
     fig.update_layout(template='plotly_dark', polar=dict(radialaxis=dict(visible=False)))
@@ -48,10 +50,17 @@ def poincare_plot(ibi_df: pd.DataFrame) -> go.Figure:
         fig.update_layout(title_text='Not enough IBI samples')
         return fig
 
-    x = s[:-1].values
-    y = s[1:].values
+    # both axes are views into one array
+    arr = s.to_numpy()
+    x = arr[:-1]
+    y = arr[1:]
+    # thin the (IBI_n, IBI_n+1) pairs, not the series, so every plotted pair stays consecutive
+    step = max(1, -(-len(x) // _POINCARE_MAX_POINTS))
+    if step > 1:
+        x, y = x[::step], y[::step]
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x, y=y, mode='markers', marker=dict(size=3, opacity=0.5)))
+    # WebGL markers stay responsive on year-long IBI series where SVG stalls the browser
+    fig.add_trace(go.Scattergl(x=x, y=y, mode='markers', marker=dict(size=3, opacity=0.5)))
     fig.update_layout(title='Poincaré Plot', xaxis_title='IBI_n (ms)', yaxis_title='IBI_n+1 (ms)', template='plotly_white')
     return fig
 
@@ -66,18 +75,17 @@ def sleep_ribbon_plot(sleep_df: pd.DataFrame) -> go.Figure:
     fig = go.Figure()
     colors = {'wake': '#FF0000', 'rem': '#00FFFF', 'deep': '#00008B', 'light': '#ADD8E6', None: '#888'}
 
-    for idx, row in sleep_df.iterrows():
-        start = row.get('start')
-        dur = row.get('duration_s') or 0
-        level = str(row.get('level') or '').lower()
-        color = colors.get(level, colors[None])
-        try:
-            base = start.hour + start.minute / 60
-            y_label = start.date().isoformat()
-        except Exception:
-            base = 0
-            y_label = str(idx)
-        fig.add_trace(go.Bar(x=[dur / 3600], y=[y_label], base=[base], orientation='h', marker_color=color, showlegend=False))
+    # one trace for all stages; a trace per row made figure building O(n) in plotly validation
+    n = len(sleep_df)
+    start = pd.to_datetime(sleep_df['start'], errors='coerce') if 'start' in sleep_df.columns else pd.Series(pd.NaT, index=sleep_df.index)
+    dur = pd.to_numeric(sleep_df['duration_s'], errors='coerce').fillna(0).to_numpy() if 'duration_s' in sleep_df.columns else np.zeros(n)
+    level = sleep_df['level'].astype(object) if 'level' in sleep_df.columns else pd.Series([None] * n, index=sleep_df.index)
+    color = level.where(level.notna(), '').astype(str).str.lower().map(colors).fillna(colors[None])
+    base = (start.dt.hour + start.dt.minute / 60).fillna(0)
+    # rows without a usable start fall back to their index label, as before
+    y_label = start.dt.strftime('%Y-%m-%d').where(start.notna(), pd.Series(sleep_df.index.astype(str), index=sleep_df.index))
+    fig.add_trace(go.Bar(x=dur / 3600, y=y_label.to_numpy(), base=base.to_numpy(dtype=float), orientation='h',
+                         marker_color=color.to_numpy(), showlegend=False))
 
     fig.update_layout(title='Sleep Architecture Ribbon', template='plotly_white', height=400)
     return fig
@@ -128,10 +136,10 @@ def sleep_duration_trend(sleep_df: pd.DataFrame) -> go.Figure:
         fig = go.Figure()
         fig.update_layout(title_text='No sleep data')
         return fig
-    sleep_df = sleep_df.copy()
     if 'start' in sleep_df.columns:
-        sleep_df['date'] = pd.to_datetime(sleep_df['start']).dt.date
-        daily_sleep = sleep_df.groupby('date')['duration_s'].sum() / 3600
+        # group on normalised timestamps: no frame copy and no Python date objects
+        nights = pd.to_datetime(sleep_df['start']).dt.normalize()
+        daily_sleep = sleep_df['duration_s'].groupby(nights).sum() / 3600
         fig = go.Figure()
         fig.add_trace(go.Bar(x=daily_sleep.index, y=daily_sleep, name='Hours', marker=dict(color='#6366F1')))
         fig.update_layout(title='Sleep Duration per Night', xaxis_title='Date', yaxis_title='Hours', template='plotly_white')
@@ -147,11 +155,13 @@ def activity_heatmap(steps_df: pd.DataFrame) -> go.Figure:
         fig = go.Figure()
         fig.update_layout(title_text='No steps data')
         return fig
-    steps_df = steps_df.copy()
-    steps_df['hour'] = steps_df.index.hour
-    steps_df['date'] = steps_df.index.date
-    pivot = steps_df.pivot_table(values='steps', index='date', columns='hour', aggfunc='sum', fill_value=0)
-    fig = go.Figure(data=go.Heatmap(z=pivot.values, x=pivot.columns, y=pivot.index, colorscale='Viridis'))
+    # (day, hour) cells are small integers, so a flat bincount replaces the hashing pivot_table
+    idx = steps_df.index
+    date_codes, dates = pd.factorize(idx.normalize(), sort=True)
+    flat = date_codes * 24 + idx.hour.to_numpy()
+    steps = np.nan_to_num(pd.to_numeric(steps_df['steps'], errors='coerce').to_numpy(dtype=float))
+    z = np.bincount(flat, weights=steps, minlength=len(dates) * 24).reshape(len(dates), 24)
+    fig = go.Figure(data=go.Heatmap(z=z, x=np.arange(24), y=dates.date, colorscale='Viridis'))
     fig.update_layout(title='Hourly Activity Heatmap', xaxis_title='Hour of Day', yaxis_title='Date', template='plotly_white')
     return fig
 
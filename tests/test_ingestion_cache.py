@@ -1,8 +1,11 @@
+import json
 import os
 import shutil
+import zipfile
 from pathlib import Path
 import pandas as pd
-from src.ingestion import FitbitLoader
+import pytest
+from src.ingestion import FitbitLoader, derive_ibi
 from tests.helpers import create_sample_takeout_zip
 
 
@@ -51,12 +54,221 @@ def test_incremental_zip_processing(tmp_path, monkeypatch):
     assert len(keys) >= 2
 
     # create a third zip with additional heart records
+    first_run_records = len(progress)
     zip3 = create_sample_takeout_zip(data_dir, 'takeout3.zip', heart_records=4, step_records=0, include_daily_csv=False)
     res2 = loader.process_all(progress_callback=cb)
 
     hr_df2 = pd.read_parquet(hr_cache)
     assert len(hr_df2) >= 9  # 5 + 4
 
-    # progress log should contain entries
+    # progress log should contain entries, for the latest run only
     plog = loader.get_progress_log()
     assert len(plog) > 0
+    assert len(plog) == len(progress) - first_run_records
+
+
+def test_load_cached_after_process_all(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=3, step_records=2, include_daily_csv=True)
+
+    loader = FitbitLoader(str(data_dir))
+    # no caches yet
+    assert loader.load_cached() is None
+
+    loader.process_all()
+
+    # the sample zip has no sleep sources, so there is no sleep cache to wait for
+    dfs = loader.load_cached()
+    assert dfs is not None
+    assert dfs['sleep'].empty
+    assert len(dfs['heart_rate']) == 3
+    assert len(dfs['steps']) == 2
+    assert len(dfs['ibi']) == 3
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_loose_files_in_nested_folders(tmp_path, monkeypatch, max_workers):
+    data_dir = tmp_path / 'takeout'
+    nested = data_dir / 'Fitbit' / 'Global Export Data'
+    nested.mkdir(parents=True)
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    # tiny trees are parsed inline; force the pool so max_workers=2 exercises it
+    monkeypatch.setattr('src.ingestion._POOL_MIN_FILES', 1)
+    (nested / 'heart_rate-2023-01-02.json').write_text(json.dumps([
+        {'dateTime': '2023-01-02T00:00:00', 'value': {'bpm': 61, 'confidence': 2}},
+        {'dateTime': '2023-01-02T00:00:05', 'value': {'bpm': 0, 'confidence': 0}},
+    ]))
+    (nested / 'steps-2023-01-02.json').write_text(json.dumps([{'dateTime': '2023-01-02T00:01:00', 'value': '12'}]))
+    (nested / 'notes.json').write_text('[]')
+    create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=2, step_records=1)
+
+    loader = FitbitLoader(str(data_dir), max_workers=max_workers)
+    hr = loader.load_heart_rate()
+    assert len(hr) == 4
+    assert hr.loc['2023-01-02 00:00:00', 'bpm'] == 61
+    steps = loader.load_steps()
+    assert steps['steps'].sum() == 12 + 100
+    assert len(derive_ibi(hr)) == 3
+
+
+def test_cache_survives_touched_sources(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    zip1 = create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=2, step_records=1)
+
+    assert len(FitbitLoader(str(data_dir)).load_heart_rate()) == 2
+    cache = FitbitLoader(str(data_dir))._cache_file('heart_rate')
+    cache_mtime = cache.stat().st_mtime
+
+    # a restore bumps mtimes but leaves names and sizes alone: the cache is kept
+    os.utime(zip1, (cache_mtime + 60, cache_mtime + 60))
+    assert len(FitbitLoader(str(data_dir)).load_heart_rate()) == 2
+    assert cache.stat().st_mtime == cache_mtime
+
+    # a new export changes the signature and the mtime check rebuilds the cache
+    create_sample_takeout_zip(data_dir, 'takeout2.zip', heart_records=3, step_records=1)
+    os.utime(cache, (cache_mtime - 3600, cache_mtime - 3600))
+    assert len(FitbitLoader(str(data_dir)).load_heart_rate()) == 5
+
+
+def test_load_sleep_mixed_timestamp_formats(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    (data_dir / 'sleep-2023-01-01.json').write_text(json.dumps({'levels': {'data': [
+        {'dateTime': '2023-01-01T23:00:00.000', 'level': 'light', 'seconds': 600},
+        {'dateTime': '2023-01-01T23:10:00', 'level': 'deep', 'seconds': 300},
+    ]}}))
+
+    sleep = FitbitLoader(str(data_dir), max_workers=1).load_sleep()
+    assert len(sleep) == 2
+    assert list(sleep['level']) == ['light', 'deep']
+
+
+def test_process_all_survives_malformed_source(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    (data_dir / 'steps-2023-01-03.json').write_text('[1, 2, 3]')
+    create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=2, step_records=1)
+
+    loader = FitbitLoader(str(data_dir), max_workers=1)
+    progress = []
+    res = loader.process_all(progress_callback=lambda src, msg: progress.append((src, msg)))
+    assert len(res['heart_rate']) == 2
+    assert len(pd.read_parquet(loader._cache_file('steps'))) == 1
+    assert any(src.endswith('steps-2023-01-03.json') and msg.startswith('error:') for src, msg in progress)
+    # both are recorded: the malformed file is only re-read once it changes
+    meta = loader._load_processed_metadata()
+    assert any(k.endswith('steps-2023-01-03.json') for k in meta)
+    assert any(k.endswith('takeout1.zip') for k in meta)
+
+
+def test_malformed_zip_member_is_merged_once(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    zip1 = create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=5, step_records=1)
+    with zipfile.ZipFile(zip1, 'a') as zf:
+        zf.writestr('steps-2023-01-03.json', '[1, 2, 3]')
+
+    loader = FitbitLoader(str(data_dir), max_workers=1)
+    assert len(loader.process_all()['heart_rate']) == 5
+    assert any(k.endswith('takeout1.zip') for k in loader._load_processed_metadata())
+    # the zip's good members are not merged a second time
+    assert len(loader.process_all()['heart_rate']) == 5
+
+
+def test_interrupted_process_all_records_nothing_unmerged(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    (data_dir / 'heart_rate-2023-01-02.json').write_text(json.dumps([{'dateTime': '2023-01-02T00:00:00', 'value': {'bpm': 61, 'confidence': 2}}]))
+
+    def _crash(*args):
+        raise RuntimeError('worker died')
+
+    loader = FitbitLoader(str(data_dir), max_workers=1)
+    monkeypatch.setattr('src.ingestion._parse_source', _crash)
+    with pytest.raises(RuntimeError):
+        loader.process_all()
+    assert loader._load_processed_metadata() == {}
+
+    monkeypatch.undo()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    assert len(loader.process_all()['heart_rate']) == 1
+
+
+def _kill_worker(src, content):
+    os._exit(1)
+
+
+def test_broken_pool_is_replaced(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+    from src import ingestion
+    monkeypatch.setattr('src.ingestion._POOL_MIN_FILES', 1)
+    with pytest.raises(BrokenProcessPool):
+        list(ingestion._map_files(_kill_worker, [('a.json', b''), ('b.json', b'')], max_workers=2))
+    # the next load gets a fresh pool instead of the dead one
+    assert list(ingestion._map_files(ingestion._parse_source, [('notes.json', b'[]')], max_workers=2)) == [('notes.json', None, ())]
+
+
+def test_long_lived_loader_notices_new_files(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    create_sample_takeout_zip(data_dir, 'takeout1.zip', heart_records=2, step_records=1, include_daily_csv=True)
+
+    loader = FitbitLoader(str(data_dir), max_workers=1)
+    loader.process_all()
+    os.remove(loader._last_run_path())
+    assert loader.load_cached() is not None
+
+    (data_dir / 'heart_rate-2023-01-05.json').write_text(json.dumps([{'dateTime': '2023-01-05T00:00:00', 'value': {'bpm': 70, 'confidence': 2}}]))
+    # pretend the source TTL has passed instead of sleeping through it
+    loader._sources_ts -= 60
+    assert not loader.get_cache_status()['heart_rate']['fresh']
+    assert loader.load_cached() is None
+    assert len(loader.load_heart_rate()) == 3
+
+
+def test_interrupted_process_all_resumes_from_staged_batches(tmp_path, monkeypatch):
+    from src import ingestion
+    data_dir = tmp_path / 'takeout'
+    data_dir.mkdir()
+    monkeypatch.setattr('pathlib.Path.cwd', lambda: tmp_path)
+    monkeypatch.setattr('src.ingestion._META_FLUSH_EVERY', 1)
+    for day in (1, 2, 3):
+        (data_dir / f'heart_rate-2023-01-0{day}.json').write_text(json.dumps([{'dateTime': f'2023-01-0{day}T00:00:00', 'value': {'bpm': 60 + day, 'confidence': 2}}]))
+
+    parse = ingestion._parse_source
+    parsed = []
+
+    def _crash_on_third_file(src, content):
+        parsed.append(src)
+        if len(parsed) == 3:
+            raise RuntimeError('worker died')
+        return parse(src, content)
+
+    loader = FitbitLoader(str(data_dir), max_workers=1)
+    monkeypatch.setattr('src.ingestion._parse_source', _crash_on_third_file)
+    with pytest.raises(RuntimeError):
+        loader.process_all()
+    # nothing is merged mid-run, but the first finished file was staged
+    assert not loader._cache_file('heart_rate').exists()
+    assert list(loader._staging_dir().glob('batch-*.json'))
+
+    monkeypatch.setattr('src.ingestion._parse_source', parse)
+    merges = []
+    merge_new = loader._merge_new
+    monkeypatch.setattr(loader, '_merge_new', lambda *a: merges.append(1) or merge_new(*a))
+    hr = loader.process_all()['heart_rate']
+    # the staged file is not re-read, the other two are; all merged in one go
+    assert sorted(hr['bpm'].tolist()) == [61, 62, 63]
+    assert merges == [1]
+    assert len(loader._load_processed_metadata()) == 3
+    assert not loader._staging_dir().exists()
+    assert len(loader.process_all()['heart_rate']) == 3